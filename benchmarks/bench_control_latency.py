@@ -0,0 +1,149 @@
+"""Latency of pause, resume and stop, during a transfer and a conversion
+
+Drives DownloadManager._download_item with a stand-in session whose
+"transfer" calls the progress hook every few milliseconds and whose
+"conversion" runs a long subprocess through yt_dlp.utils.Popen, as the
+FFmpeg post-processors do. Measures how long each request takes to take
+effect. Runs offline; the job databases go to a temporary HOME.
+
+    python benchmarks/bench_control_latency.py --rounds 20
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from threading import Thread, get_ident
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="bench_control_")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from downloader import (  # noqa: E402
+    DownloadManager,
+    _track_subprocesses,
+    _worker_controls,
+)
+
+HOOK_INTERVAL = 0.005
+CONVERSION = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+class FakeSession:
+    """Calls the hook like a transfer, then optionally runs a "conversion" """
+
+    def __init__(self, convert=False):
+        self.convert = convert
+        self.started = None
+        self.ended = None
+
+    def download(self, url, outtmpl, progress_hook):
+        from yt_dlp.utils import Popen
+
+        self.started = time.perf_counter()
+        try:
+            if self.convert:
+                Popen.run(CONVERSION)
+                return 1
+            for i in range(100000):
+                progress_hook({"status": "downloading", "downloaded_bytes": i})
+                time.sleep(HOOK_INTERVAL)
+            return 0
+        except Exception:
+            # yt-dlp with ignoreerrors reports a failed download this way
+            return 1
+        finally:
+            self.ended = time.perf_counter()
+
+
+def start_job(manager, session):
+    manager.jobs.remove("job")
+    job = manager.jobs.register("job")
+    job.begin([1], 1)
+    control = job.control
+
+    def work():
+        _worker_controls[get_ident()] = control
+        try:
+            manager._download_item(
+                "job",
+                session,
+                "url",
+                "out",
+                lambda d: manager.update_progress(d, "job", 1, 1, 1),
+            )
+        finally:
+            _worker_controls.pop(get_ident(), None)
+
+    thread = Thread(target=work, daemon=True)
+    thread.start()
+    while session.started is None:
+        time.sleep(0.001)
+    time.sleep(0.05)
+    return thread
+
+
+def measure_pause_resume(manager):
+    session = FakeSession()
+    thread = start_job(manager, session)
+
+    requested = time.perf_counter()
+    manager.pause_download("job")
+    while session.ended is None:
+        time.sleep(0.0005)
+    pause = session.ended - requested
+
+    session.started = None
+    requested = time.perf_counter()
+    manager.resume_download("job")
+    while session.started is None:
+        time.sleep(0.0005)
+    resume = session.started - requested
+
+    manager.stop_download("job")
+    thread.join()
+    return pause, resume
+
+
+def measure_stop(manager, convert):
+    session = FakeSession(convert)
+    thread = start_job(manager, session)
+    requested = time.perf_counter()
+    manager.stop_download("job")
+    thread.join()
+    return session.ended - requested
+
+
+def report(name, samples):
+    samples = [s * 1000 for s in samples]
+    print(
+        f"{name:<22} median {statistics.median(samples):7.2f} ms, "
+        f"max {max(samples):7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    _track_subprocesses()
+    manager = DownloadManager(None)
+    pauses, resumes, stops, conversion_stops = [], [], [], []
+    for _ in range(args.rounds):
+        pause, resume = measure_pause_resume(manager)
+        pauses.append(pause)
+        resumes.append(resume)
+        stops.append(measure_stop(manager, convert=False))
+        conversion_stops.append(measure_stop(manager, convert=True))
+
+    print(f"rounds: {args.rounds}")
+    report("pause (transfer)", pauses)
+    report("resume", resumes)
+    report("stop (transfer)", stops)
+    report("stop (conversion)", conversion_stops)
+
+
+if __name__ == "__main__":
+    main()
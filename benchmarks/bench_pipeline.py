@@ -0,0 +1,74 @@
+"""Playlist time with post-processing inline and in its own pipeline stage
+
+Each simulated video "downloads" by sleeping (network-bound) and then
+"converts" in a CPU-bound child process, as ffmpeg does. Inline, a worker
+does both before taking the next video; pipelined, it hands the file to
+DownloadManager.postprocessing and goes on downloading. Runs offline; the
+job databases go to a temporary HOME.
+
+    python benchmarks/bench_pipeline.py --videos 16 --download 0.5 --convert 0.5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="bench_pipeline_")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from downloader import DownloadManager  # noqa: E402
+
+# Burns the given CPU time, so conversions compete for the cores like ffmpeg
+CONVERT = (
+    "import time\nend = time.process_time() + {}\nwhile time.process_time() < end: pass"
+)
+
+
+def convert(seconds):
+    subprocess.run([sys.executable, "-c", CONVERT.format(seconds)], check=True)
+
+
+def run(manager, videos, workers, download, convert_seconds, pipelined):
+    manager.jobs.remove("job")
+    manager.jobs.register("job")
+
+    def worker(item, worker_id):
+        time.sleep(download)
+        if pipelined:
+            return manager.postprocessing.submit(convert, convert_seconds)
+        convert(convert_seconds)
+
+    start = time.perf_counter()
+    manager._run_worker_pool("job", [(i, None) for i in range(videos)], worker, workers)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--videos", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--download", type=float, default=0.5)
+    parser.add_argument("--convert", type=float, default=0.5)
+    args = parser.parse_args()
+
+    manager = DownloadManager(None)
+    inline = run(manager, args.videos, args.workers, args.download, args.convert, False)
+    pipelined = run(
+        manager, args.videos, args.workers, args.download, args.convert, True
+    )
+
+    rounds = args.videos / args.workers
+    print(
+        f"videos: {args.videos}, workers: {args.workers}, "
+        f"post-processing workers: {manager.postprocessing.workers}"
+    )
+    print(f"download only: {rounds * args.download:6.2f} s")
+    print(f"inline:        {inline:6.2f} s")
+    print(f"pipelined:     {pipelined:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
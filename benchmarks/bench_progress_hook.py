@@ -0,0 +1,188 @@
+"""Per-callback cost of the yt-dlp progress hook, before and after sampling
+
+Feeds synthetic "downloading" callbacks, as yt-dlp sends them, into the
+previous hook (speed list rebuilt and three sizes formatted on every call)
+and into DownloadManager.update_progress. Runs offline; the job databases
+go to a temporary HOME.
+
+    python benchmarks/bench_progress_hook.py --calls 200000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from threading import Event
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="bench_progress_")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from downloader import (  # noqa: E402
+    STATUS_PAUSED,
+    DownloadManager,
+    format_size,
+    format_time,
+)
+
+
+class LegacyProgressHook:
+    def update_progress(
+        self, d, download_id, video_index=None, video_count=None, worker_id=None
+    ):
+        """The per-callback work update_progress did before sampling"""
+        if self.stop_events.get(download_id, Event()).is_set():
+            # Download was stopped, raise an exception to break the download
+            raise Exception("Download stopped by user")
+
+        # Handle pausing
+        while self.pause_events.get(download_id, Event()).is_set():
+            if self.status_callback:
+                self.status_callback(
+                    {"status": STATUS_PAUSED, "download_id": download_id}
+                )
+            time.sleep(0.5)
+            if self.stop_events.get(download_id, Event()).is_set():
+                raise Exception("Download stopped by user")
+
+        job_progress = self.job_progress.get(download_id, {})
+
+        if d["status"] == "downloading":
+            try:
+                # Calculate speed
+                current_time = time.time()
+                time_diff = current_time - self.last_update_time.get(
+                    download_id, current_time
+                )
+                if time_diff > 0:
+                    # Get downloaded bytes
+                    downloaded_bytes = d.get("downloaded_bytes", 0)
+                    total_bytes = d.get("total_bytes", 0) or d.get(
+                        "total_bytes_estimate", 0
+                    )
+
+                    # Calculate speed
+                    speed = d.get("speed", 0)
+                    if speed:
+                        self.download_speeds[download_id] = self.download_speeds.get(
+                            download_id, []
+                        )[-9:] + [speed]
+
+                    # Calculate average speed
+                    avg_speed = sum(self.download_speeds.get(download_id, [1])) / len(
+                        self.download_speeds.get(download_id, [1])
+                    )
+
+                    # Calculate ETA
+                    eta = d.get("eta", 0)
+                    eta_str = format_time(eta) if eta else "Unknown"
+
+                    # Format speed
+                    speed_str = (
+                        format_size(avg_speed) + "/s" if avg_speed else "Unknown"
+                    )
+
+                    # Format progress
+                    percent = d.get("_percent_str", "Unknown").strip()
+                    filename = os.path.basename(d.get("filename", "Unknown"))
+
+                    # Format size
+                    downloaded_str = format_size(downloaded_bytes)
+                    total_str = format_size(total_bytes) if total_bytes else "Unknown"
+
+                    # Update status
+                    if self.status_callback:
+                        self.status_callback(
+                            {
+                                "status": "downloading",
+                                "download_id": download_id,
+                                "filename": filename,
+                                "percent": percent,
+                                "speed": speed_str,
+                                "eta": eta_str,
+                                "progress": d.get("downloaded_bytes", 0)
+                                / (
+                                    d.get("total_bytes", 1)
+                                    or d.get("total_bytes_estimate", 1)
+                                ),
+                                "downloaded": downloaded_str,
+                                "total": total_str,
+                                "playlist_index": video_index
+                                or d.get("info_dict", {}).get("playlist_index", 0),
+                                "playlist_count": video_count
+                                or d.get("info_dict", {}).get("n_entries", 0),
+                                "worker_id": worker_id,
+                                "videos_completed": job_progress.get("completed", 0),
+                                "videos_total": job_progress.get("total", 0),
+                            }
+                        )
+
+                    # Update last time
+                    self.last_update_time[download_id] = current_time
+            except:
+                pass
+
+
+def make_callbacks(calls):
+    total = 50 * 1024 * 1024
+    return [
+        {
+            "status": "downloading",
+            "downloaded_bytes": total * i // calls,
+            "total_bytes": total,
+            "speed": 1_000_000.0 + (i % 100) * 1000,
+            "eta": (calls - i) / 100,
+            "_percent_str": f"{100 * i / calls:5.1f}%",
+            "filename": "/tmp/01. Some video.mp4",
+            "info_dict": {"playlist_index": 1, "n_entries": 10},
+        }
+        for i in range(calls)
+    ]
+
+
+def run(hook, callbacks, download_id):
+    start = time.perf_counter()
+    for d in callbacks:
+        hook.update_progress(d, download_id, 1, 10, 1)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+
+    callbacks = make_callbacks(args.calls)
+    events = {"legacy": 0, "current": 0}
+
+    legacy = LegacyProgressHook()
+    legacy.status_callback = lambda info: events.__setitem__(
+        "legacy", events["legacy"] + 1
+    )
+    legacy.stop_events = {"job": Event()}
+    legacy.pause_events = {"job": Event()}
+    legacy.last_update_time = {"job": time.time()}
+    legacy.download_speeds = {"job": []}
+    legacy.job_progress = {}
+
+    manager = DownloadManager(
+        lambda info: events.__setitem__("current", events["current"] + 1)
+    )
+    manager.jobs.register("job").begin(range(1, 11), 1)
+
+    before = run(legacy, callbacks, "job")
+    after = run(manager, callbacks, "job")
+
+    print(f"callbacks: {args.calls}")
+    print(
+        f"before: {before / args.calls * 1e6:6.2f} us/callback, "
+        f"{events['legacy']} events"
+    )
+    print(
+        f"after:  {after / args.calls * 1e6:6.2f} us/callback, "
+        f"{events['current']} events"
+    )
+
+
+if __name__ == "__main__":
+    main()
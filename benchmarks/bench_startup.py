@@ -0,0 +1,75 @@
+"""Cold-start import report for the GUI and CLI entry points
+
+Runs each entry point's imports under ``python -X importtime`` in a fresh
+interpreter, prints the slowest top-level imports and fails when a module
+that should be loaded lazily shows up, or when the import time goes over
+the budget.
+
+    python benchmarks/bench_startup.py [--budget-ms 150] [--top 10]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Entry point -> modules that must not be imported at startup
+ENTRY_POINTS = {
+    "gui": ("yt_dlp", "PIL", "humanize"),
+    "main": ("yt_dlp", "PIL", "humanize", "tkinter"),
+}
+
+
+def import_times(module):
+    """Return [(cumulative_us, depth, name)] for every import made by module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # Nested imports are indented two spaces per level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times.append((int(cumulative), depth, name.strip()))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=150)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    failed = False
+    for module, forbidden in ENTRY_POINTS.items():
+        times = import_times(module)
+        total_ms = next(us for us, _, name in times if name == module) / 1000
+
+        print(f"== import {module}: {total_ms:.1f} ms (budget {args.budget_ms} ms)")
+        direct = [(us, name) for us, depth, name in times if depth == 1]
+        for us, name in sorted(direct, reverse=True)[: args.top]:
+            print(f"  {us / 1000:8.1f} ms  {name}")
+
+        loaded = sorted(
+            {name for _, _, name in times if name.split(".")[0] in forbidden}
+        )
+        if loaded:
+            print(f"  FAIL: loaded at startup: {', '.join(loaded[:5])}")
+            failed = True
+        if total_ms > args.budget_ms:
+            print("  FAIL: over budget")
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
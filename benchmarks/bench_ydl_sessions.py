@@ -0,0 +1,84 @@
+"""Per-row YoutubeDL setup cost: new instance per CSV row vs. reused sessions
+
+Runs offline. It only measures the work download_from_csv does around each
+row before any network request, for a CSV of --rows rows.
+
+    python benchmarks/bench_ydl_sessions.py --rows 500
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yt_dlp  # noqa: E402
+
+from downloader import FORMAT_OPTIONS, YoutubeDLSession  # noqa: E402
+
+
+def build_opts(output_dir):
+    return {
+        "format": FORMAT_OPTIONS[0][1],
+        "outtmpl": os.path.join(output_dir, "%(title)s.%(ext)s"),
+        "ignoreerrors": True,
+        "quiet": True,
+        "postprocessors": [
+            {"key": "FFmpegVideoConvertor", "preferedformat": "mp4"},
+            {"key": "FFmpegMetadata", "add_metadata": True},
+        ],
+        "noplaylist": True,
+        "continuedl": True,
+        "merge_output_format": "mp4",
+        "keepvideo": False,
+    }
+
+
+def per_row_instances(rows, output_dir):
+    """What download_from_csv used to do: one YoutubeDL per row"""
+    start = time.perf_counter()
+    for row in range(1, rows + 1):
+        opts = build_opts(output_dir)
+        opts["outtmpl"] = os.path.join(output_dir, f"{row}. %(title)s.%(ext)s")
+        opts["progress_hooks"] = [lambda d: None]
+        with yt_dlp.YoutubeDL(opts):  # type: ignore
+            pass
+    return time.perf_counter() - start
+
+
+def reused_session(rows, output_dir):
+    """One long-lived session, only the template and hook swapped per row"""
+    start = time.perf_counter()
+    session = YoutubeDLSession(build_opts(output_dir))
+    for row in range(1, rows + 1):
+        session.ydl.params["outtmpl"]["default"] = os.path.join(
+            output_dir, f"{row}. %(title)s.%(ext)s"
+        )
+        session._progress_hook = lambda d: None
+    session.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    args = parser.parse_args()
+
+    output_dir = tempfile.mkdtemp()
+    before = per_row_instances(args.rows, output_dir)
+    after = reused_session(args.rows, output_dir)
+
+    print(f"rows: {args.rows}")
+    print(
+        f"new YoutubeDL per row: {before:.3f}s ({before / args.rows * 1000:.2f} ms/row)"
+    )
+    print(
+        f"reused session:        {after:.3f}s ({after / args.rows * 1000:.3f} ms/row)"
+    )
+    print(f"setup removed:         {before - after:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
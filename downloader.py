@@ -0,0 +1,3185 @@
+import os
+import re
+from threading import Thread, Lock, Condition, get_ident, local
+import weakref
+from array import array
+from bisect import bisect_left
+from queue import Queue, Empty
+from collections import OrderedDict
+import time
+import json
+from datetime import datetime
+import sys
+import csv
+
+# ===== Configuration settings =====
+# CSV file for URL list
+CSV_FILE_NAME = "URL_LIST.csv"
+CSV_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), CSV_FILE_NAME)
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.expanduser("~"), "Downloads", "YouTube")
+
+# Download history
+HISTORY_DB_PATH = os.path.join(
+    os.path.expanduser("~"), ".youtube_downloader_history.db"
+)
+HISTORY_JSON_PATH = os.path.join(
+    os.path.expanduser("~"), ".youtube_downloader_history.json"
+)  # Used by older versions, migrated on first start
+
+# States of the items of a job in its resume manifest
+ITEM_PENDING = "pending"
+ITEM_DOWNLOADING = "downloading"
+ITEM_PROCESSING = "post-processing"
+ITEM_DONE = "done"
+ITEM_FAILED = "failed"
+
+# Playlist metadata cache
+PLAYLIST_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".youtube_downloader_playlists.db"
+)
+PLAYLIST_CACHE_TTL = 60 * 60  # Seconds a cached playlist is used without a refresh
+PLAYLIST_CACHE_MAX_AGE = 30 * 24 * 60 * 60  # Playlists unused this long are dropped
+PLAYLIST_STREAM_BATCH = 200  # Entries handed to on_entries at a time while loading
+PLAYLIST_STREAM_INTERVAL = 0.5  # Or at least this often, in seconds
+
+# Thumbnail cache
+THUMBNAIL_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".youtube_downloader_thumbnails"
+)
+THUMBNAIL_CACHE_MAX_BYTES = 50 * 1024 * 1024  # Oldest thumbnails evicted beyond this
+THUMBNAIL_SIZE = (160, 90)
+THUMBNAIL_WORKERS = 4  # Thumbnails fetched in parallel for the video list
+
+# Status messages
+STATUS_READY = "Ready to download"
+STATUS_PREVIEWING = "Loading playlist details..."
+STATUS_DOWNLOADING = "Downloading..."
+STATUS_PAUSED = "Download paused"
+STATUS_STOPPED = "Download stopped"
+STATUS_COMPLETE = "Download completed!"
+STATUS_INCOMPLETE = "Download finished, {} of {} videos failed"
+STATUS_ERROR = "Error: {}"
+DEFAULT_STATUS = STATUS_READY
+
+# Download options
+FORMAT_OPTIONS = [
+    (
+        "Best Quality (Video + Audio)",
+        "bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best",
+    ),
+    (
+        "HD 1080p",
+        "bestvideo[height<=1080][ext=mp4]+bestaudio[ext=m4a]/best[height<=1080][ext=mp4]/best[height<=1080]",
+    ),
+    (
+        "HD 720p",
+        "bestvideo[height<=720][ext=mp4]+bestaudio[ext=m4a]/best[height<=720][ext=mp4]/best[height<=720]",
+    ),
+    (
+        "480p",
+        "bestvideo[height<=480][ext=mp4]+bestaudio[ext=m4a]/best[height<=480][ext=mp4]/best[height<=480]",
+    ),
+    (
+        "360p",
+        "bestvideo[height<=360][ext=mp4]+bestaudio[ext=m4a]/best[height<=360][ext=mp4]/best[height<=360]",
+    ),
+    ("Audio Only (MP3)", "bestaudio[ext=m4a]/bestaudio"),
+    ("Audio Only (Original)", "bestaudio"),
+]
+# Audio formats: label -> (codec, bitrate in kbps); no codec keeps the
+# downloaded audio stream as it is
+AUDIO_OUTPUTS = {
+    "Audio Only (MP3)": ("mp3", "192"),
+    "Audio Only (Original)": (None, None),
+}
+# Transfer settings per format: (fragments of a DASH/HLS stream fetched at
+# once, bytes asked for per HTTP request, initial read buffer in bytes)
+TRANSFER_SETTINGS = {
+    "Best Quality (Video + Audio)": (8, 10 * 1024 * 1024, 64 * 1024),
+    "HD 1080p": (8, 10 * 1024 * 1024, 64 * 1024),
+    "HD 720p": (4, 10 * 1024 * 1024, 32 * 1024),
+    "480p": (4, 10 * 1024 * 1024, 16 * 1024),
+    "360p": (2, 10 * 1024 * 1024, 16 * 1024),
+    "Audio Only (MP3)": (1, 10 * 1024 * 1024, 16 * 1024),
+    "Audio Only (Original)": (1, 10 * 1024 * 1024, 16 * 1024),
+}
+AUDIO_BITRATE_TOLERANCE = 0.05  # An existing file this close in bitrate is kept
+# How a downloaded video is made into an MP4, cheapest first
+CONVERT_NONE = "none"  # Already an MP4 with MP4 codecs
+CONVERT_REMUX = "remux"  # MP4 codecs in another container; streams are copied
+CONVERT_TRANSCODE = "transcode"  # Codecs MP4 cannot hold; re-encoded
+CONVERT_EXISTING = "existing"  # The output was already there, same settings
+VIDEO_CONVERSION_STEPS = {
+    CONVERT_NONE: [],
+    CONVERT_REMUX: [{"key": "FFmpegVideoRemuxer", "preferedformat": "mp4"}],
+    CONVERT_TRANSCODE: [{"key": "FFmpegVideoConvertor", "preferedformat": "mp4"}],
+}
+# Codecs ffmpeg stores in MP4 as they are ("none" is a missing stream)
+MP4_VIDEO_CODECS = {"none", "avc1", "avc3", "h264", "hev1", "hvc1", "h265", "hevc"}
+MP4_VIDEO_CODECS |= {"av01", "vp09", "vp9", "mp4v"}
+MP4_AUDIO_CODECS = {"none", "mp4a", "aac", "mp3", "opus", "ac-3", "ec-3", "alac"}
+DEFAULT_OUTPUT_TEMPLATE = "%(playlist_index)s. %(title)s.%(ext)s"
+ARCHIVE_FILE_NAME = ".download_archive ({}).txt"  # In the output dir, per format
+DEFAULT_MAX_WORKERS = 4  # Videos downloaded in parallel per playlist
+PROGRESS_SAMPLE_HZ = 10  # Progress events per second per worker
+PROGRESS_SPEED_SMOOTHING = 0.3  # EWMA weight of the newest speed sample
+DEFAULT_JOB_PRIORITY = 1  # Relative share of the bandwidth limit a job gets
+BANDWIDTH_BURST = 1.0  # Seconds of its share a job may save up and spend at once
+BANDWIDTH_IDLE_TIMEOUT = 2.0  # A job that read nothing this long leaves its share
+POSTPROCESS_WORKERS = os.cpu_count() or 1  # Files converted at the same time
+POSTPROCESS_QUEUE_SIZE = 8  # Downloaded files waiting for conversion, at most
+AUTOTUNE_SAMPLE_SECONDS = 5.0  # Download time measured at each fragment level
+AUTOTUNE_MIN_GAIN = 0.1  # Fragments are doubled while each step is this much faster
+AUTOTUNE_MAX_FRAGMENTS = 32
+QUEUE_SLOTS = 2  # Queued jobs downloaded at the same time
+QUEUE_WORKERS = 2 * DEFAULT_MAX_WORKERS  # Video workers split by the running jobs
+
+# Queued job states
+QUEUE_WAITING = "waiting"
+QUEUE_RUNNING = "running"
+QUEUE_PAUSED = "paused"
+
+
+def resource_path(relative_path):
+    """Get absolute path to resource, works for dev and for PyInstaller"""
+    try:
+        # PyInstaller creates a temp folder and stores path in _MEIPASS
+        base_path = getattr(sys, "_MEIPASS", os.path.abspath("."))
+    except Exception:
+        base_path = os.path.abspath(".")
+
+    return os.path.join(base_path, relative_path)
+
+
+def initialize_csv_file():
+    """Create URL_LIST.csv if it doesn't exist"""
+    if not os.path.exists(CSV_FILE_PATH):
+        try:
+            with open(CSV_FILE_PATH, "w", newline="", encoding="utf-8") as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(["title", "url"])  # Write header
+                # Add a sample row
+                writer.writerow(
+                    ["Sample Video Title", "https://www.youtube.com/watch?v=example"]
+                )
+            print(f"Created {CSV_FILE_NAME} at {CSV_FILE_PATH}")
+        except Exception as e:
+            print(f"Error creating CSV file: {e}")
+    return CSV_FILE_PATH
+
+
+def read_csv_playlist(csv_path=CSV_FILE_PATH):
+    """Read video list from CSV file"""
+    videos = []
+    try:
+        with open(csv_path, "r", newline="", encoding="utf-8") as csvfile:
+            reader = csv.DictReader(csvfile)
+
+            # Normalize header names to lowercase for case-insensitive matching
+            if reader.fieldnames:
+                reader.fieldnames = [
+                    name.lower() if name else name for name in reader.fieldnames
+                ]
+
+            for row_num, row in enumerate(reader, start=1):
+                # Check for both 'title' and 'url' columns (case-insensitive)
+                title = row.get("title", "").strip()
+                url = row.get("url", "").strip()
+
+                if title and url:
+                    videos.append(
+                        {
+                            "title": title,
+                            "url": url,
+                            "row_number": row_num,
+                        }
+                    )
+    except Exception as e:
+        print(f"Error reading CSV file: {e}")
+        return None
+    return videos
+
+
+def format_size(bytes_size):
+    """Format bytes to human-readable size"""
+    import humanize
+
+    return humanize.naturalsize(bytes_size)
+
+
+def format_time(seconds):
+    """Format seconds to human-readable time"""
+    if seconds < 60:
+        return f"{seconds:.0f} sec"
+    elif seconds < 3600:
+        minutes = seconds / 60
+        return f"{minutes:.1f} min"
+    else:
+        hours = seconds / 3600
+        return f"{hours:.1f} hrs"
+
+
+def normalize_youtube_url(url):
+    """
+    Normalize YouTube URLs to a standard format.
+    Handles both short URLs (youtu.be) and standard URLs.
+    Supports single videos, playlists, and channels.
+
+    Examples:
+    - https://youtu.be/VIDEO_ID -> https://www.youtube.com/watch?v=VIDEO_ID
+    - https://youtu.be/VIDEO_ID?list=PLAYLIST_ID -> https://www.youtube.com/watch?v=VIDEO_ID&list=PLAYLIST_ID
+    - Already normalized URLs are returned as-is
+    """
+    from urllib.parse import urlparse, parse_qs, urlencode
+
+    url = url.strip()
+
+    # Handle youtu.be short URLs
+    if "youtu.be" in url:
+        try:
+            parsed = urlparse(url)
+            # Extract video ID from path
+            video_id = parsed.path.lstrip("/")
+
+            # Parse query parameters if any (like list parameter)
+            query_params = parse_qs(parsed.query)
+
+            # Build new URL
+            new_params = {"v": video_id}
+            if "list" in query_params:
+                new_params["list"] = query_params["list"][0]
+
+            query_string = urlencode(new_params)
+            return f"https://www.youtube.com/watch?{query_string}"
+        except Exception as e:
+            print(f"Error normalizing URL: {e}")
+            return url
+
+    # Return other URLs as-is (yt-dlp handles them)
+    return url
+
+
+def youtube_video_id(url):
+    """Return the video ID of a YouTube video URL, or None"""
+    from urllib.parse import urlparse, parse_qs
+
+    parsed = urlparse(normalize_youtube_url(url))
+    if "youtube.com" not in parsed.netloc:
+        return None
+    if parsed.path == "/watch":
+        ids = parse_qs(parsed.query).get("v")
+        return ids[0] if ids else None
+    parts = parsed.path.strip("/").split("/")
+    if len(parts) == 2 and parts[0] in ("shorts", "live", "embed"):
+        return parts[1]
+    return None
+
+
+def format_playlist_items(indices):
+    """Format 0-based indices as 1-based yt-dlp playlist_items ranges
+
+    >>> format_playlist_items([0, 1, 4, 5, 6, 9])
+    '1-2,5-7,10'
+    """
+    parts = []
+    start = previous = None
+    for index in sorted(indices):
+        if previous is not None and index == previous + 1:
+            previous = index
+            continue
+        if start is not None:
+            parts.append(_format_item_range(start, previous))
+        start = previous = index
+    if start is not None:
+        parts.append(_format_item_range(start, previous))
+    return ",".join(parts)
+
+
+def _format_item_range(start, end):
+    if start == end:
+        return str(start + 1)
+    return f"{start + 1}-{end + 1}"
+
+
+def parse_playlist_items(spec):
+    """Parse 1-based playlist_items like "1-3,7" into sorted 0-based indices"""
+    indices = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition("-")
+        start = int(start)
+        end = int(end) if end else start
+        if start < 1 or end < start:
+            raise ValueError(f"Invalid playlist item range: {part}")
+        indices.update(range(start - 1, end))
+    return sorted(indices)
+
+
+def parse_rate(text):
+    """Parse a rate like "5M" or "500K" into bytes/s; "" or "0" means no limit"""
+    number = text.strip().upper().removesuffix("/S").removesuffix("B")
+    if not number:
+        return None
+    multiplier = 1
+    if number[-1] in "KMG":
+        multiplier = 1024 ** ("KMG".index(number[-1]) + 1)
+        number = number[:-1]
+    try:
+        rate = float(number) * multiplier
+    except ValueError:
+        raise ValueError(f"Invalid rate: {text}") from None
+    if rate < 0:
+        raise ValueError(f"Invalid rate: {text}")
+    return rate or None
+
+
+def parse_time_window(text):
+    """Parse "22:00-06:00" into (start, end) minutes after midnight"""
+    try:
+        start, end = (
+            datetime.strptime(part.strip(), "%H:%M") for part in text.split("-")
+        )
+    except ValueError:
+        raise ValueError(f"Invalid time window: {text}") from None
+    return start.hour * 60 + start.minute, end.hour * 60 + end.minute
+
+
+def format_label(format_option):
+    """Return the FORMAT_OPTIONS label of a format string"""
+    return next(
+        (label for label, f in FORMAT_OPTIONS if f == format_option), format_option
+    )
+
+
+def is_audio_format(format_option):
+    """Whether a format string is one of the audio-only FORMAT_OPTIONS"""
+    return format_label(format_option) in AUDIO_OUTPUTS
+
+
+def transfer_options(format_option, fragments=None):
+    """yt-dlp options for the TRANSFER_SETTINGS of a format string
+
+    fragments, when given, replaces the format's fragment concurrency.
+    """
+    default, chunk_size, buffer_size = TRANSFER_SETTINGS.get(
+        format_label(format_option), TRANSFER_SETTINGS[FORMAT_OPTIONS[0][0]]
+    )
+    return {
+        "concurrent_fragment_downloads": fragments or default,
+        "http_chunk_size": chunk_size,
+        "buffersize": buffer_size,
+    }
+
+
+def file_conversion(format_option):
+    """Return the function choosing the conversion of each downloaded file
+
+    It takes the file's info dict and returns the conversion (CONVERT_*)
+    and the post-processors doing it, or None for no post-processing.
+    """
+    if is_audio_format(format_option):
+        codec, bitrate = AUDIO_OUTPUTS[format_label(format_option)]
+        return lambda info: audio_conversion(info, codec, bitrate)
+
+    def convert(info):
+        conversion = video_conversion(info)
+        return conversion, VIDEO_CONVERSION_STEPS[conversion]
+
+    return convert
+
+
+def video_conversion(info):
+    """Choose how a downloaded video becomes an MP4, from its info dict
+
+    Returns CONVERT_NONE, CONVERT_REMUX or CONVERT_TRANSCODE depending on
+    the container and the codecs yt-dlp reported. Unknown codecs are only
+    trusted in a file that is already an MP4.
+    """
+    in_mp4 = info.get("ext") == "mp4"
+    for key, supported in (("vcodec", MP4_VIDEO_CODECS), ("acodec", MP4_AUDIO_CODECS)):
+        codec = (info.get(key) or "").split(".")[0].lower()
+        if codec not in supported and (codec or not in_mp4):
+            return CONVERT_TRANSCODE
+    return CONVERT_NONE if in_mp4 else CONVERT_REMUX
+
+
+def audio_conversion(info, codec, bitrate):
+    """Choose how a downloaded track becomes the audio file that is kept
+
+    Without a codec, the downloaded stream is kept and at most copied into
+    an audio container. A track whose codec output already exists at about
+    the same bitrate is not transcoded again.
+    """
+    if codec is None:
+        ext = "." + (info.get("ext") or "")
+        conversion = (
+            CONVERT_NONE if ext in DownloadArchive.AUDIO_EXTENSIONS else CONVERT_REMUX
+        )
+        return conversion, [{"key": "FFmpegExtractAudio", "preferredcodec": "best"}]
+
+    if converted_audio_exists(info["filepath"], codec, bitrate):
+        return CONVERT_EXISTING, None
+    return CONVERT_TRANSCODE, [
+        {
+            "key": "FFmpegExtractAudio",
+            "preferredcodec": codec,
+            "preferredquality": bitrate,
+        }
+    ]
+
+
+def existing_output(format_option):
+    """Return the function telling whether a download can be skipped
+
+    It takes the path yt-dlp is about to download a video to and returns
+    whether the file converted from it is already there, with the same
+    settings (see audio_conversion). None if the format's output can only
+    be judged once the video is downloaded.
+    """
+    if not is_audio_format(format_option):
+        return None
+    codec, bitrate = AUDIO_OUTPUTS[format_label(format_option)]
+    if codec is None:
+        return None
+    return lambda filename: converted_audio_exists(filename, codec, bitrate)
+
+
+def converted_audio_exists(filename, codec, bitrate):
+    """Whether filename's codec audio file is there, at about bitrate kbps"""
+    target = os.path.splitext(filename)[0] + "." + codec
+    return target != filename and audio_output_matches(target, codec, bitrate)
+
+
+def audio_output_matches(path, codec, bitrate):
+    """Whether path holds codec audio at about bitrate kbps, going by ffprobe"""
+    if not os.path.exists(path):
+        return False
+    from yt_dlp.postprocessor.ffmpeg import FFmpegPostProcessor
+
+    try:
+        metadata = FFmpegPostProcessor(None).get_metadata_object(path)
+    except Exception:
+        return False
+    stream = next(
+        (s for s in metadata.get("streams", []) if s.get("codec_type") == "audio"),
+        None,
+    )
+    if stream is None or stream.get("codec_name") != codec:
+        return False
+    actual = float(stream.get("bit_rate") or metadata["format"].get("bit_rate") or 0)
+    expected = float(bitrate) * 1000
+    return abs(actual - expected) <= expected * AUDIO_BITRATE_TOLERANCE
+
+
+def entry_thumbnail_url(entry, width=0):
+    """Return the smallest thumbnail of a playlist entry at least width wide"""
+    thumbnails = [t for t in entry.get("thumbnails") or () if t.get("url")]
+    if not thumbnails:
+        return entry.get("thumbnail")
+    thumbnails.sort(key=lambda t: t.get("width") or 0)
+    for thumbnail in thumbnails:
+        if (thumbnail.get("width") or 0) >= width:
+            return thumbnail["url"]
+    return thumbnails[-1]["url"]
+
+
+class VideoSelection:
+    """Which entries of a playlist are selected, one byte per entry
+
+    Toggling an entry is O(1) and bulk operations (select all, clear,
+    invert, range select) run as single C-level slice operations, so even
+    playlists with thousands of entries stay cheap to click through.
+    Iterating yields the selected indices in order and len() is the number
+    of selected entries; size is the number of entries.
+    """
+
+    _INVERT = bytes([1, 0]) + bytes(254)
+
+    def __init__(self, size=0, selected=False):
+        self.size = size
+        self._bits = bytearray([1 if selected else 0]) * size
+        self._count = size if selected else 0
+
+    @classmethod
+    def from_indices(cls, size, indices):
+        selection = cls(size)
+        for index in indices:
+            if 0 <= index < size:
+                selection.set(index, True)
+        return selection
+
+    def copy(self):
+        selection = VideoSelection()
+        selection.size = self.size
+        selection._bits = bytearray(self._bits)
+        selection._count = self._count
+        return selection
+
+    def __contains__(self, index):
+        return 0 <= index < self.size and self._bits[index] == 1
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        bits = self._bits
+        index = bits.find(1)
+        while index != -1:
+            yield index
+            index = bits.find(1, index + 1)
+
+    def extend(self, count, selected=False):
+        """Add count entries at the end, for playlists still being loaded"""
+        self._bits.extend(bytes([1 if selected else 0]) * count)
+        self.size += count
+        if selected:
+            self._count += count
+
+    def set(self, index, selected):
+        value = 1 if selected else 0
+        if self._bits[index] != value:
+            self._bits[index] = value
+            self._count += 1 if selected else -1
+
+    def toggle(self, index):
+        self.set(index, not self._bits[index])
+
+    def select_all(self):
+        self.select_range(0, self.size, True)
+
+    def clear(self):
+        self.select_range(0, self.size, False)
+
+    def select_range(self, start, stop, selected=True):
+        """Set every entry in [start, stop) to selected"""
+        start = max(0, start)
+        stop = min(self.size, stop)
+        if start >= stop:
+            return
+        self._count -= self._bits.count(1, start, stop)
+        self._bits[start:stop] = bytes([1 if selected else 0]) * (stop - start)
+        if selected:
+            self._count += stop - start
+
+    def invert(self):
+        self._bits = self._bits.translate(self._INVERT)
+        self._count = self.size - self._count
+
+
+class JobControl:
+    """Pause and stop state of one download job
+
+    Workers block on a condition variable while the job is paused instead
+    of polling, and are woken as soon as it is resumed or stopped. Stopping
+    also kills the subprocesses (ffmpeg) that yt-dlp started from threads
+    working on the job, so a long conversion does not delay it.
+    """
+
+    def __init__(self):
+        self.paused = False
+        self.stopped = False
+        self._condition = Condition()
+        self._processes = weakref.WeakSet()
+
+    def pause(self):
+        with self._condition:
+            if not self.stopped:
+                self.paused = True
+
+    def resume(self):
+        with self._condition:
+            self.paused = False
+            self._condition.notify_all()
+
+    def stop(self):
+        with self._condition:
+            self.stopped = True
+            self.paused = False
+            self._condition.notify_all()
+            processes = list(self._processes)
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+
+    def wait_while_paused(self):
+        """Block while paused; return False if the job is stopped"""
+        with self._condition:
+            while self.paused and not self.stopped:
+                self._condition.wait()
+            return not self.stopped
+
+    def track(self, process):
+        """Kill process when the job is stopped"""
+        with self._condition:
+            self._processes.add(process)
+            stopped = self.stopped
+        if stopped:
+            process.kill()
+
+
+# Thread ident -> JobControl of the job that thread is downloading for
+_worker_controls = {}
+
+
+def _track_subprocesses():
+    """Register every subprocess yt-dlp starts with the calling worker's job"""
+    from yt_dlp.utils import Popen
+
+    if getattr(Popen, "_job_tracking", False):
+        return
+    original_init = Popen.__init__
+
+    def __init__(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        control = _worker_controls.get(get_ident())
+        if control is not None:
+            control.track(self)
+
+    Popen.__init__ = __init__
+    Popen._job_tracking = True
+
+
+class DownloadJob:
+    """What a DownloadManager tracks about one job while it runs
+
+    Per-worker state is kept in arrays indexed by worker_id, and per-item
+    state in arrays indexed by the item's position among the job's sorted
+    item keys, instead of in dicts of dicts keyed by download ID. A job
+    costs about 3 KB, mostly its JobControl, plus 14 bytes per item, so
+    hundreds of running or queued jobs stay cheap. begin() sizes the
+    arrays once the items are known; until then a job only carries its
+    control, so a queued job can already be paused or stopped.
+    """
+
+    __slots__ = (
+        "id",
+        "control",
+        "audio",  # Audio is extracted; the conversion rate is reported
+        "tuner",  # FragmentTuner, when auto-tuning
+        "completed",  # Items finished, successfully or not
+        "keys",  # Sorted item keys (playlist indices or CSV rows)
+        "states",  # Per item: position of its state in STATES
+        "conversions",  # Per item: position of its conversion in CONVERSIONS
+        "conversion_seconds",  # Per item
+        "first_conversion",  # When the first conversion started, or None
+        "last_conversion",  # When the last one finished
+        "speeds",  # Per worker: EWMA speed in bytes/s, 0 before a sample
+        "last_events",  # Per worker: when its last progress event was published
+        "transferred",  # Per worker: bytes of the current file reported, or -1
+        "_lock",
+    )
+
+    STATES = (ITEM_PENDING, ITEM_DOWNLOADING, ITEM_PROCESSING, ITEM_DONE, ITEM_FAILED)
+    CONVERSIONS = (CONVERT_NONE, CONVERT_REMUX, CONVERT_TRANSCODE, CONVERT_EXISTING)
+    NOT_CONVERTED = 255
+
+    def __init__(self, job_id):
+        self.id = job_id
+        self.control = JobControl()
+        self.audio = False
+        self.tuner = None
+        self._lock = Lock()
+        self.begin((), 0)
+
+    def begin(self, keys, workers):
+        """Size the arrays for these item keys and worker IDs 1..workers"""
+        count = len(keys)
+        self.keys = array("q", sorted(keys))
+        self.completed = 0
+        self.states = bytearray(count)  # All ITEM_PENDING
+        self.conversions = bytearray([self.NOT_CONVERTED]) * count
+        self.conversion_seconds = array("f", bytes(4 * count))
+        self.first_conversion = None
+        self.last_conversion = None
+        # Slot 0 takes progress reported without a worker
+        self.speeds = array("d", bytes(8 * (workers + 1)))
+        self.last_events = array("d", bytes(8 * (workers + 1)))
+        self.transferred = array("q", [-1]) * (workers + 1)
+
+    @property
+    def total(self):
+        return len(self.keys)
+
+    @property
+    def failed(self):
+        """Number of items that could not be downloaded or converted"""
+        return self.states.count(self.STATES.index(ITEM_FAILED))
+
+    def position(self, key):
+        """Return the position of an item key, or None"""
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            return position
+        return None
+
+    def set_state(self, key, state):
+        """Record an item's state; return False if it already had it"""
+        position = self.position(key)
+        if position is None:
+            return True
+        code = self.STATES.index(state)
+        if self.states[position] == code:
+            return False
+        self.states[position] = code
+        return True
+
+    def item_done(self):
+        """Count a finished item; return how many are finished"""
+        with self._lock:
+            self.completed += 1
+            return self.completed
+
+    def log_conversion(self, key, conversion, started, finished):
+        position = self.position(key)
+        if position is None:
+            return
+        with self._lock:
+            self.conversions[position] = self.CONVERSIONS.index(conversion)
+            self.conversion_seconds[position] = finished - started
+            if self.first_conversion is None or started < self.first_conversion:
+                self.first_conversion = started
+            if self.last_conversion is None or finished > self.last_conversion:
+                self.last_conversion = finished
+
+    def converted(self):
+        """Return {item key: [conversion, seconds]} of the converted items"""
+        return {
+            str(key): [self.CONVERSIONS[code], round(seconds, 2)]
+            for key, code, seconds in zip(
+                self.keys, self.conversions, self.conversion_seconds
+            )
+            if code != self.NOT_CONVERTED
+        }
+
+
+class JobRegistry:
+    """The running DownloadJobs of a manager, by ID
+
+    New IDs are a job's start time in whole seconds, as before, but are
+    never handed out twice: a job started in the same second as the last
+    one gets the next free second. taken(job_id), when given, rules out
+    IDs used by earlier runs, such as those in the history.
+    """
+
+    def __init__(self, taken=None):
+        self._jobs = {}
+        self._lock = Lock()
+        self._last = 0
+        self._taken = taken
+
+    def new_id(self):
+        with self._lock:
+            job_id = max(int(time.time()), self._last + 1)
+            while str(job_id) in self._jobs or (
+                self._taken and self._taken(str(job_id))
+            ):
+                job_id += 1
+            self._last = job_id
+        return str(job_id)
+
+    def register(self, job_id):
+        """Return the job with this ID, registering a new one if needed"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                job = self._jobs[job_id] = DownloadJob(job_id)
+            return job
+
+    def remove(self, job_id):
+        with self._lock:
+            return self._jobs.pop(job_id, None)
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def __getitem__(self, job_id):
+        return self._jobs[job_id]
+
+    def __contains__(self, job_id):
+        return job_id in self._jobs
+
+    def __iter__(self):
+        return iter(list(self._jobs))
+
+    def __len__(self):
+        return len(self._jobs)
+
+
+class BandwidthLimiter:
+    """One bandwidth limit shared by all running jobs
+
+    Each job draws from its own token bucket, refilled at its share of the
+    limit: the limit split by priority between the jobs that are reading.
+    A job that read nothing for BANDWIDTH_IDLE_TIMEOUT seconds (converting,
+    paused, between videos) drops out and its share goes to the others.
+    The limit and its time-of-day windows can be changed at any time.
+    """
+
+    def __init__(self, rate=None, windows=()):
+        self._condition = Condition()
+        self._jobs = {}  # job_id -> [priority, tokens, last refill, last read]
+        self.configure(rate, windows)
+
+    def configure(self, rate=None, windows=()):
+        """Limit to rate bytes/s (None for no limit), except in windows
+
+        windows are (start, end, rate) with start and end in minutes after
+        midnight, local time; inside a window its own rate applies.
+        """
+        with self._condition:
+            self.rate = rate
+            self.windows = list(windows)
+            self.limited = rate is not None or any(
+                window_rate is not None for _, _, window_rate in self.windows
+            )
+            self._condition.notify_all()
+
+    def current_rate(self, now=None):
+        """The limit in effect at the datetime now, by default the current time"""
+        if not self.windows:
+            return self.rate
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+        for start, end, rate in self.windows:
+            if start <= end:
+                inside = start <= minute < end
+            else:
+                inside = minute >= start or minute < end
+            if inside:
+                return rate
+        return self.rate
+
+    def set_priority(self, job_id, priority):
+        """Weight job_id's share of the limit; priority must be positive"""
+        with self._condition:
+            self._job(job_id, time.monotonic())[0] = priority
+            self._condition.notify_all()
+
+    def add(self, job_id, priority=DEFAULT_JOB_PRIORITY):
+        """Share the limit with job_id, unless its priority was already set"""
+        with self._condition:
+            if job_id not in self._jobs:
+                self.set_priority(job_id, priority)
+
+    def remove(self, job_id):
+        with self._condition:
+            self._jobs.pop(job_id, None)
+            self._condition.notify_all()
+
+    def wake(self):
+        """Let blocked downloads check whether they were paused or stopped"""
+        with self._condition:
+            self._condition.notify_all()
+
+    def consume(self, job_id, nbytes, control=None):
+        """Count nbytes read by job_id, blocking while it is over its share
+
+        Returns early once control is paused or stopped.
+        """
+        with self._condition:
+            now = time.monotonic()
+            job = self._job(job_id, now)
+            job[1] -= nbytes
+            while True:
+                rate = self.current_rate()
+                if rate is None:
+                    job[1] = 0.0
+                    return
+                share = self._refill(job, now, rate)
+                if job[1] >= 0 or (
+                    control is not None and (control.stopped or control.paused)
+                ):
+                    return
+                self._condition.wait(-job[1] / share)
+                now = time.monotonic()
+
+    def _job(self, job_id, now):
+        job = self._jobs.get(job_id)
+        if job is None:
+            job = self._jobs[job_id] = [DEFAULT_JOB_PRIORITY, 0.0, now, now]
+        return job
+
+    def _refill(self, job, now, rate):
+        """Add the tokens earned since the last refill; return the share"""
+        job[3] = now
+        total = sum(
+            other[0]
+            for other in self._jobs.values()
+            if now - other[3] < BANDWIDTH_IDLE_TIMEOUT
+        )
+        share = rate * job[0] / total
+        job[1] = min(job[1] + share * (now - job[2]), share * BANDWIDTH_BURST)
+        job[2] = now
+        return share
+
+
+class FragmentTuner:
+    """Raises a job's fragment concurrency for as long as that pays off
+
+    Each video is downloaded at the tuner's current level. Once the streams
+    finished at that level add up to AUTOTUNE_SAMPLE_SECONDS of download
+    time, their throughput is compared with the level before: the level is
+    doubled while every step is at least AUTOTUNE_MIN_GAIN faster, and
+    otherwise settles on the fastest level measured.
+    """
+
+    def __init__(self, fragments, maximum=AUTOTUNE_MAX_FRAGMENTS):
+        self.maximum = maximum
+        self.level = max(1, min(fragments, maximum))
+        self.settled = False
+        self.best = None  # (level, bytes/s) of the fastest level measured
+        self._lock = Lock()
+        self._levels = {}  # worker_id -> level of the video it is downloading
+        self._bytes = 0
+        self._seconds = 0.0
+
+    def start(self, worker_id):
+        """Return the level for the next video of a worker"""
+        with self._lock:
+            self._levels[worker_id] = self.level
+            return self.level
+
+    def record(self, worker_id, nbytes, seconds):
+        """Count a stream a worker finished downloading in seconds"""
+        with self._lock:
+            if self.settled or self._levels.get(worker_id) != self.level:
+                return
+            if not nbytes or not seconds:
+                return
+            self._bytes += nbytes
+            self._seconds += seconds
+            if self._seconds < AUTOTUNE_SAMPLE_SECONDS:
+                return
+            throughput = self._bytes / self._seconds
+            self._bytes, self._seconds = 0, 0.0
+            if self.best and throughput < self.best[1] * (1 + AUTOTUNE_MIN_GAIN):
+                # Gains flattened out; go back to the fastest level
+                self.level = self.best[0]
+                self.settled = True
+                return
+            self.best = (self.level, throughput)
+            if self.level >= self.maximum:
+                self.settled = True
+            else:
+                self.level = min(self.level * 2, self.maximum)
+
+
+class YoutubeDLSession:
+    """A long-lived YoutubeDL reused for many single-video downloads
+
+    Building a YoutubeDL re-initialises the extractors, HTTP opener, cookie
+    jar and post-processor chain, and drops per-session caches such as the
+    player JS and signature functions. A session is built once per worker
+    and only the output template and progress hook are swapped per video.
+    A session must only be used by one thread at a time.
+
+    With output_exists (see existing_output), a video whose converted file
+    is already there is skipped before it is downloaded, and skipped is
+    set.
+    """
+
+    def __init__(self, ydl_opts, output_exists=None):
+        import yt_dlp
+
+        _track_subprocesses()
+        self._progress_hook = None
+        self._output_exists = output_exists
+        self.skipped = False
+        ydl_opts = dict(ydl_opts)
+        ydl_opts["progress_hooks"] = [self._dispatch_progress]
+        if output_exists is not None:
+            ydl_opts["match_filter"] = self._match_filter
+        self.ydl = yt_dlp.YoutubeDL(ydl_opts)  # type: ignore
+        self.handoff = _FileHandoff()
+        self.ydl.add_post_processor(self.handoff, when="after_move")
+
+    def _dispatch_progress(self, d):
+        if self._progress_hook:
+            self._progress_hook(d)
+
+    def _match_filter(self, info, *, incomplete):
+        # Called with the chosen format, so the file name is the final one
+        if incomplete:
+            return None
+        if self._output_exists(self.ydl.prepare_filename(info)):
+            self.skipped = True
+            return "The converted file is already there"
+        return None
+
+    def download(self, url, outtmpl, progress_hook=None):
+        """Download a single URL to outtmpl, reporting through progress_hook
+
+        Returns 0 if this URL downloaded, or was skipped, without error,
+        else 1.
+        """
+        self.ydl.params["outtmpl"]["default"] = outtmpl
+        self._progress_hook = progress_hook
+        self.handoff.info = None
+        self.skipped = False
+        # YoutubeDL keeps the return code of its first error for good, which
+        # would fail every later video of the session
+        self.ydl._download_retcode = 0
+        try:
+            return self.ydl.download([url])
+        finally:
+            self._progress_hook = None
+
+    def set_option(self, name, value):
+        """Change a yt-dlp option for the next downloads of this session"""
+        self.ydl.params[name] = value
+
+    def close(self):
+        self.ydl.close()
+
+
+class _FileHandoff:
+    """Last post-processor of a session; keeps the info of the finished file
+
+    The info dict is everything YoutubeDL.post_process needs to run the
+    real post-processors on the file later, elsewhere.
+    """
+
+    def __init__(self):
+        self.info = None
+
+    def set_downloader(self, downloader):
+        pass
+
+    def add_progress_hook(self, hook):
+        pass
+
+    def run(self, info):
+        self.info = info
+        return [], info
+
+
+class PostProcessingPool:
+    """Post-processes downloaded files while the workers download the next
+
+    Download workers hand files over with submit() instead of converting
+    them in the yt-dlp call, so the network and the CPU are busy at the
+    same time. ffmpeg runs as a process of its own; the pool's threads,
+    one per core, only drive it. submit() blocks while queue_size files
+    are already waiting, so downloads stay at most that far ahead.
+    """
+
+    def __init__(self, workers=POSTPROCESS_WORKERS, queue_size=POSTPROCESS_QUEUE_SIZE):
+        self.workers = workers
+        self._slots = workers + queue_size
+        self._pending = 0
+        self._condition = Condition()
+        self._executor = None
+
+    def submit(self, fn, *args, control=None):
+        """Run fn(*args) in the pool and return its Future
+
+        Returns None instead if control is stopped while waiting for room.
+        """
+        with self._condition:
+            while self._pending >= self._slots:
+                if control is not None and control.stopped:
+                    return None
+                self._condition.wait()
+            self._pending += 1
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                self._executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="postprocess"
+                )
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future):
+        with self._condition:
+            self._pending -= 1
+            self._condition.notify_all()
+
+    def wake(self):
+        """Let workers waiting for room check whether they were stopped"""
+        with self._condition:
+            self._condition.notify_all()
+
+
+class StatusEventQueue:
+    """Thread-safe, coalescing channel for status events
+
+    Download threads publish() events and the UI thread drain()s them on a
+    timer. Progress events ("downloading"/"processing") and repeated pause
+    notices only keep their latest value per download and worker, so the
+    amount of work per drain is bounded by the number of active workers,
+    not by how often yt-dlp reports progress. All other events are
+    delivered once each, in the order they were published.
+    """
+
+    COALESCED_STATUSES = {
+        "downloading": "progress",
+        "processing": "progress",
+        STATUS_PAUSED: "paused",
+        "queue": "queue",
+    }
+
+    def __init__(self):
+        self._lock = Lock()
+        self._events = OrderedDict()
+        self._sequence = 0
+
+    def publish(self, status_info):
+        """Queue a status event; safe to call from any thread"""
+        with self._lock:
+            kind = None
+            if isinstance(status_info, dict):
+                kind = self.COALESCED_STATUSES.get(status_info.get("status"))
+
+            if kind:
+                key = (
+                    status_info.get("download_id"),
+                    status_info.get("worker_id"),
+                    kind,
+                )
+                # Move to the end so the event keeps its place after any
+                # events published since the value it replaces
+                self._events.pop(key, None)
+            else:
+                self._sequence += 1
+                key = self._sequence
+            self._events[key] = status_info
+
+    def drain(self):
+        """Return and clear all pending events, oldest first"""
+        with self._lock:
+            events = list(self._events.values())
+            self._events.clear()
+        return events
+
+
+class HistoryStore:
+    """Download history kept in SQLite
+
+    Every entry is stored as one row holding the full entry as JSON, plus
+    the columns the History tab filters on. Updates go straight to the row
+    of a job id, every write is its own transaction, and pages are read
+    newest first with keyset pagination. An existing JSON history file is
+    imported once and then renamed to *.migrated.
+    """
+
+    def __init__(self, db_path=HISTORY_DB_PATH, legacy_json_path=HISTORY_JSON_PATH):
+        import sqlite3
+
+        self.db_path = db_path
+        self._lock = Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS history (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id TEXT NOT NULL,
+                    date TEXT,
+                    status TEXT,
+                    url TEXT,
+                    data TEXT NOT NULL
+                )
+                """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS history_id ON history(id)")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS history_status ON history(status, seq)"
+            )
+
+        if legacy_json_path and os.path.exists(legacy_json_path):
+            self._migrate_json(legacy_json_path)
+
+    def _migrate_json(self, json_path):
+        """Import a history file written by older versions, once"""
+        try:
+            with open(json_path, "r") as f:
+                entries = json.load(f)
+        except Exception as e:
+            # Leave the file in place so nothing is lost
+            print(f"Error reading old history file {json_path}: {e}")
+            return
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO history (id, date, status, url, data) VALUES (?, ?, ?, ?, ?)",
+                [self._row(entry) for entry in entries if isinstance(entry, dict)],
+            )
+        os.replace(json_path, json_path + ".migrated")
+
+    @staticmethod
+    def _row(entry):
+        return (
+            str(entry.get("id", "")),
+            entry.get("date"),
+            entry.get("status"),
+            entry.get("url"),
+            json.dumps(entry),
+        )
+
+    @staticmethod
+    def _entry(seq, data):
+        entry = json.loads(data)
+        entry["_seq"] = seq  # Position in the history, used for paging
+        return entry
+
+    def add(self, entry):
+        """Append a new history entry"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO history (id, date, status, url, data) VALUES (?, ?, ?, ?, ?)",
+                self._row(entry),
+            )
+
+    def update(self, job_id, **fields):
+        """Merge fields into the entry of job_id"""
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT seq, data FROM history WHERE id = ?", (job_id,)
+            ).fetchall()
+            for seq, data in rows:
+                entry = json.loads(data)
+                entry.update(fields)
+                self._conn.execute(
+                    "UPDATE history SET date = ?, status = ?, url = ?, data = ? WHERE seq = ?",
+                    self._row(entry)[1:] + (seq,),
+                )
+
+    def get(self, job_id):
+        """Return the entry of job_id, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT seq, data FROM history WHERE id = ? ORDER BY seq DESC LIMIT 1",
+                (job_id,),
+            ).fetchone()
+        return self._entry(*row) if row else None
+
+    def page(
+        self,
+        limit=50,
+        before_seq=None,
+        after_seq=None,
+        status=None,
+        url=None,
+        since=None,
+    ):
+        """Return up to limit entries, newest first
+
+        Pass the "_seq" of the last entry of a page as before_seq to get the
+        next one, or the "_seq" of the first entry as after_seq to get the
+        previous one. Entries can be filtered by exact status, by a substring
+        of the URL and by a "YYYY-MM-DD" date they were started on or after.
+        """
+        query = "SELECT seq, data FROM history"
+        conditions = []
+        params = []
+        if before_seq is not None:
+            conditions.append("seq < ?")
+            params.append(before_seq)
+        if after_seq is not None:
+            conditions.append("seq > ?")
+            params.append(after_seq)
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        if url:
+            conditions.append("url LIKE ? ESCAPE '\\'")
+            params.append("%" + self._escape_like(url) + "%")
+        if since:
+            conditions.append("date >= ?")
+            params.append(since)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        # The previous page is the entries just after after_seq
+        order = "ASC" if after_seq is not None else "DESC"
+        query += f" ORDER BY seq {order} LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        if after_seq is not None:
+            rows.reverse()
+        return [self._entry(seq, data) for seq, data in rows]
+
+    @staticmethod
+    def _escape_like(text):
+        return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    @staticmethod
+    def matches(entry, status=None, url=None, since=None):
+        """Whether entry passes the same filters as page()"""
+        if status and entry.get("status") != status:
+            return False
+        if url and url.lower() not in (entry.get("url") or "").lower():
+            return False
+        if since and (entry.get("date") or "") < since:
+            return False
+        return True
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JobManifest:
+    """Durable record of the items of every unfinished download job
+
+    Kept next to the history in the same SQLite file. A job is written with
+    all its selected items before the first one starts, and each item's
+    state is saved as it changes, so after a crash or an app restart the job
+    can continue at its first item that is not done. Jobs are removed once
+    they complete or are stopped by the user.
+    """
+
+    def __init__(self, db_path=HISTORY_DB_PATH):
+        import sqlite3
+
+        self.db_path = db_path
+        self._lock = Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    params TEXT NOT NULL
+                )
+                """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_items (
+                    job_id TEXT NOT NULL,
+                    item INTEGER NOT NULL,
+                    state TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (job_id, item)
+                )
+                """)
+
+    def create(self, job_id, kind, params, items):
+        """Record a new job; items are (key, data) pairs, all pending"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM job_items WHERE job_id = ?", (job_id,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, kind, params) VALUES (?, ?, ?)",
+                (job_id, kind, json.dumps(params)),
+            )
+            self._conn.executemany(
+                "INSERT INTO job_items (job_id, item, state, data) VALUES (?, ?, ?, ?)",
+                [
+                    (job_id, key, ITEM_PENDING, json.dumps(data, default=str))
+                    for key, data in items
+                ],
+            )
+
+    def set_state(self, job_id, key, state):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE job_items SET state = ? WHERE job_id = ? AND item = ?",
+                (state, job_id, key),
+            )
+
+    def job(self, job_id):
+        """Return (kind, params, [(key, data)] of items not done), or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT kind, params FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            items = self._conn.execute(
+                "SELECT item, data FROM job_items "
+                "WHERE job_id = ? AND state != ? ORDER BY item",
+                (job_id, ITEM_DONE),
+            ).fetchall()
+        return row[0], json.loads(row[1]), [(key, json.loads(d)) for key, d in items]
+
+    def params(self, job_id):
+        """Return the params a job was recorded with, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT params FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def unfinished(self):
+        """Return the IDs of the recorded jobs, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id FROM jobs ORDER BY rowid DESC"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def remove(self, job_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM job_items WHERE job_id = ?", (job_id,))
+            self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TransferTuning:
+    """Fragment concurrency learned by auto-tuning, per format string
+
+    Kept next to the history in the same SQLite file, so the next job in
+    a format starts at the level the last one settled on.
+    """
+
+    def __init__(self, db_path=HISTORY_DB_PATH):
+        import sqlite3
+
+        self.db_path = db_path
+        self._lock = Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS transfer_tuning (
+                    format TEXT PRIMARY KEY,
+                    fragments INTEGER NOT NULL,
+                    throughput REAL NOT NULL,
+                    updated REAL NOT NULL
+                )
+                """)
+
+    def get(self, format_option):
+        """Return the learned fragment concurrency of a format, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fragments FROM transfer_tuning WHERE format = ?",
+                (format_option,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, format_option, fragments, throughput):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transfer_tuning "
+                "(format, fragments, throughput, updated) VALUES (?, ?, ?, ?)",
+                (format_option, fragments, throughput, time.time()),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def playlist_id_from_url(url):
+    """Return the list= playlist ID of a YouTube URL, or None"""
+    from urllib.parse import urlparse, parse_qs
+
+    ids = parse_qs(urlparse(url).query).get("list")
+    return ids[0] if ids else None
+
+
+class PlaylistCache:
+    """Flat playlist info kept in SQLite, keyed by playlist ID
+
+    URLs that do not carry the ID themselves (channel pages for example) are
+    mapped to it once the playlist has been extracted. Playlists not fetched
+    for PLAYLIST_CACHE_MAX_AGE are dropped when the cache is opened.
+    """
+
+    def __init__(self, db_path=PLAYLIST_CACHE_PATH):
+        import sqlite3
+
+        self.db_path = db_path
+        self._lock = Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS playlists (
+                    playlist_id TEXT PRIMARY KEY,
+                    fetched REAL NOT NULL,
+                    data TEXT NOT NULL
+                )
+                """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS playlist_urls (
+                    url TEXT PRIMARY KEY,
+                    playlist_id TEXT NOT NULL
+                )
+                """)
+            self._conn.execute(
+                "DELETE FROM playlists WHERE fetched < ?",
+                (time.time() - PLAYLIST_CACHE_MAX_AGE,),
+            )
+            self._conn.execute(
+                "DELETE FROM playlist_urls WHERE playlist_id NOT IN "
+                "(SELECT playlist_id FROM playlists)"
+            )
+
+    def get(self, url):
+        """Return (info, fetched timestamp) for url, or (None, None)"""
+        with self._lock:
+            playlist_id = playlist_id_from_url(url)
+            if playlist_id is None:
+                row = self._conn.execute(
+                    "SELECT playlist_id FROM playlist_urls WHERE url = ?", (url,)
+                ).fetchone()
+                if row is None:
+                    return None, None
+                playlist_id = row[0]
+            row = self._conn.execute(
+                "SELECT fetched, data FROM playlists WHERE playlist_id = ?",
+                (playlist_id,),
+            ).fetchone()
+        if row is None:
+            return None, None
+        return json.loads(row[1]), row[0]
+
+    def put(self, url, info):
+        """Store the info of a playlist and remember that url leads to it"""
+        playlist_id = info.get("id")
+        if not playlist_id:
+            return
+        data = json.dumps(info, default=str)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO playlists (playlist_id, fetched, data) "
+                "VALUES (?, ?, ?)",
+                (playlist_id, time.time(), data),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO playlist_urls (url, playlist_id) VALUES (?, ?)",
+                (url, playlist_id),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ThumbnailCache:
+    """Resized thumbnails stored on disk, keyed by URL and size
+
+    Files are named after a hash of the URL and target size, so a cached
+    thumbnail is found without any network I/O. When the directory grows past
+    max_bytes the least recently used files are removed.
+    """
+
+    def __init__(
+        self, cache_dir=THUMBNAIL_CACHE_DIR, max_bytes=THUMBNAIL_CACHE_MAX_BYTES
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._total_bytes = None  # Measured on the first write
+        self._lock = Lock()
+
+    def path(self, url, size=THUMBNAIL_SIZE):
+        """Return where the thumbnail for url at size is stored"""
+        import hashlib
+
+        key = hashlib.sha256(f"{size[0]}x{size[1]} {url}".encode("utf-8"))
+        return os.path.join(self.cache_dir, key.hexdigest() + ".jpg")
+
+    def get(self, url, size=THUMBNAIL_SIZE):
+        """Return the path of a cached thumbnail, or None if it is not cached"""
+        path = self.path(url, size)
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            return None
+        return path
+
+    def fetch(self, url, size=THUMBNAIL_SIZE):
+        """Return the path of the thumbnail, downloading it if needed
+
+        Returns None if the image could not be downloaded or decoded.
+        """
+        path = self.get(url, size)
+        if path is not None:
+            return path
+
+        import urllib.request
+        from io import BytesIO
+        from PIL import Image
+
+        try:
+            with urllib.request.urlopen(url, timeout=15) as response:
+                img = Image.open(BytesIO(response.read()))
+                # Let the JPEG decoder skip detail we would throw away, then
+                # shrink by whole factors before the final resize
+                img.draft("RGB", size)
+                img = img.convert("RGB")
+                factor = min(img.width // size[0], img.height // size[1])
+                if factor > 1:
+                    img = img.reduce(factor)
+                img = img.resize(size, Image.Resampling.BILINEAR)
+            output = BytesIO()
+            img.save(output, "JPEG", quality=90)
+        except Exception as e:
+            print(f"Error loading thumbnail: {e}")
+            return None
+        return self._store(self.path(url, size), output.getvalue())
+
+    def _store(self, path, data):
+        """Write data atomically to path, then evict old files if needed"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{id(data)}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error caching thumbnail: {e}")
+            return None
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, _, size in self._files())
+            else:
+                self._total_bytes += len(data)
+            if self._total_bytes > self.max_bytes:
+                self._evict(keep=path)
+        return path
+
+    def _files(self):
+        """Return (mtime, path, size) for every cached file"""
+        files = []
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".jpg"):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, entry.path, stat.st_size))
+        return files
+
+    def _evict(self, keep):
+        """Remove the least recently used files until below max_bytes"""
+        files = sorted(self._files())
+        self._total_bytes = sum(size for _, _, size in files)
+        for _, path, size in files:
+            if self._total_bytes <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._total_bytes -= size
+
+
+class ThumbnailPrefetcher:
+    """Fetches thumbnails into a ThumbnailCache on a few worker threads
+
+    Only the URLs given to the latest want() call are fetched, in that order,
+    so thumbnails that were scrolled past are dropped before they start.
+    on_ready(url, path) is called from a worker thread for each result.
+    """
+
+    def __init__(self, cache, on_ready, size=THUMBNAIL_SIZE, workers=THUMBNAIL_WORKERS):
+        self.cache = cache
+        self.on_ready = on_ready
+        self.size = size
+        self.workers = workers
+        self._wanted = []
+        self._in_flight = set()
+        self._threads = []
+        self._condition = Condition()
+
+    def want(self, urls):
+        """Replace the pending fetches by urls, most important first"""
+        with self._condition:
+            self._wanted = [url for url in urls if url not in self._in_flight]
+            self._wanted.reverse()  # Workers pop from the end
+            while len(self._threads) < min(self.workers, len(self._wanted)):
+                thread = Thread(target=self._worker, daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._condition.notify_all()
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                while not self._wanted:
+                    self._condition.wait()
+                url = self._wanted.pop()
+                self._in_flight.add(url)
+            try:
+                path = self.cache.fetch(url, self.size)
+            finally:
+                with self._condition:
+                    self._in_flight.discard(url)
+            if path is not None:
+                self.on_ready(url, path)
+
+
+class DownloadArchive:
+    """Videos already downloaded to a directory in one format
+
+    Backed by a file in yt-dlp's download archive format in the output
+    directory, one per format option, so it also works with
+    yt-dlp --download-archive. Every finished video is added to it.
+    The first time the archive is created, files already in the directory
+    are matched to the entries about to be downloaded, by the "[video ID]"
+    in their name, or else by title and the extension this format's files
+    end up with, so earlier downloads are not fetched again. Entries whose
+    title is not known beforehand can be checked with has_file() once
+    yt-dlp has extracted it.
+    """
+
+    AUDIO_EXTENSIONS = (".mp3", ".m4a", ".opus")
+    VIDEO_EXTENSIONS = (".mp4", ".mkv", ".webm")
+    ORIGINAL_AUDIO_EXTENSIONS = (".m4a", ".opus")  # YouTube's audio streams
+
+    def __init__(self, output_dir, format_option):
+        label = format_label(format_option)
+        slug = re.sub(r"[^a-z0-9]+", "-", label.lower()).strip("-")
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, ARCHIVE_FILE_NAME.format(slug))
+        if not is_audio_format(format_option):
+            self.extensions = self.VIDEO_EXTENSIONS
+            self.output_extensions = (".mp4",)
+        else:
+            self.extensions = self.AUDIO_EXTENSIONS
+            codec = AUDIO_OUTPUTS[label][0]
+            self.output_extensions = (
+                ("." + codec,) if codec else self.ORIGINAL_AUDIO_EXTENSIONS
+            )
+        self.ids = set()
+        self.titles = set()  # Of the files found by scan_existing
+        self._lock = Lock()
+        self.scanned = os.path.exists(self.path)
+        if self.scanned:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.ids = {line.strip() for line in f if line.strip()}
+
+    @staticmethod
+    def archive_id(entry):
+        """Return the yt-dlp archive line of an entry, or None"""
+        extractor = entry.get("ie_key") or entry.get("extractor_key")
+        if not extractor or not entry.get("id"):
+            return None
+        return f"{extractor.lower()} {entry['id']}"
+
+    def __contains__(self, entry):
+        return self.archive_id(entry) in self.ids
+
+    def add(self, entry):
+        """Record a finished download"""
+        archive_id = self.archive_id(entry)
+        if archive_id is None:
+            return
+        with self._lock:
+            if archive_id in self.ids:
+                return
+            self.ids.add(archive_id)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(archive_id + "\n")
+
+    def scan_existing(self, entries):
+        """Record entries whose file is already in the directory, once"""
+        if self.scanned:
+            return
+        from yt_dlp.utils import sanitize_filename
+
+        ids = set()
+        titles = set()  # Only of files in this format's output extension
+        if os.path.isdir(self.output_dir):
+            for name in os.listdir(self.output_dir):
+                stem, ext = os.path.splitext(name)
+                ext = ext.lower()
+                if ext not in self.extensions:
+                    continue
+                ids.update(re.findall(r"\[([\w-]{11})\]", stem))
+                if ext in self.output_extensions:
+                    titles.add(self._title(stem))
+
+        found = []
+        for entry in entries:
+            archive_id = self.archive_id(entry)
+            if archive_id is None or archive_id in self.ids:
+                continue
+            title = entry.get("title")
+            if entry["id"] in ids or (title and sanitize_filename(title) in titles):
+                found.append(archive_id)
+                self.ids.add(archive_id)
+
+        # The file is written even when nothing matched, so the scan runs once
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(archive_id + "\n" for archive_id in found)
+        self.titles = titles
+        self.scanned = True
+
+    def has_file(self, filename):
+        """Whether the scan found a file by the title of this output file
+
+        filename is where yt-dlp is about to save a video; as in the scan,
+        the number in front and the extension do not count.
+        """
+        stem = os.path.splitext(os.path.basename(filename))[0]
+        return self._title(stem) in self.titles
+
+    @staticmethod
+    def _title(stem):
+        return re.sub(r"^\d+\. ", "", stem)
+
+
+class DownloadManager:
+    def __init__(
+        self, status_callback=None, quiet=False, progress_hz=PROGRESS_SAMPLE_HZ
+    ):
+        self.status_callback = status_callback
+        self.quiet = quiet  # Silence yt-dlp's own console output
+        self.progress_interval = 1.0 / progress_hz
+        self.limiter = BandwidthLimiter()  # Shared by all jobs of this manager
+        self.postprocessing = PostProcessingPool()  # Shared, sized to the CPU
+        self._postprocessors = local()  # Per pool thread: chain -> YoutubeDL
+        self.current_playlist_info = None
+
+        # Open (or create) the history database, the manifests of unfinished
+        # jobs, the playlist cache and the learned transfer settings
+        self.history = HistoryStore()
+        self.manifest = JobManifest()
+        self.playlists = PlaylistCache()
+        self.tuning = TransferTuning()
+
+        # Running jobs; new IDs never repeat one from the history
+        self.jobs = JobRegistry(lambda job_id: self.history.get(job_id) is not None)
+
+    def get_playlist_info(
+        self, playlist_url, callback=None, max_age=PLAYLIST_CACHE_TTL, on_entries=None
+    ):
+        """Get playlist information without downloading
+
+        A playlist fetched less than max_age seconds ago is served from the
+        cache. An older one is refreshed, reading only the pages that come
+        before the first entry already known.
+
+        While a playlist is being extracted, on_entries(header, entries) is
+        called with the playlist info minus its entries and each batch of
+        entries as it arrives. The batches add up to the final entries, and
+        the entries known so far can already be downloaded.
+        """
+        if not playlist_url.strip():
+            if callback:
+                callback(None, "Please enter a valid URL")
+            return
+
+        # Normalize URL to handle both youtu.be and youtube.com formats
+        playlist_url = normalize_youtube_url(playlist_url)
+
+        try:
+            cached, fetched = self.playlists.get(playlist_url)
+            if cached is not None and time.time() - fetched < max_age:
+                info = cached
+            else:
+                info = self._extract_playlist_info(playlist_url, cached, on_entries)
+                if info.get("entries") is not None:
+                    self.playlists.put(playlist_url, info)
+        except Exception as e:
+            self.current_playlist_info = None
+            error_message = str(e)
+            if callback:
+                callback(None, error_message)
+            return None
+
+        info["original_url"] = playlist_url
+        self.current_playlist_info = info
+        if callback:
+            callback(info, None)
+        return info
+
+    def _extract_playlist_info(self, playlist_url, cached=None, on_entries=None):
+        """Run a flat extraction, stopping at entries already in cached"""
+        ydl_opts = {
+            "quiet": True,
+            "extract_flat": True,
+            "skip_download": True,
+            "force_generic_extractor": False,
+        }
+
+        import yt_dlp
+
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:  # type: ignore
+            # Unprocessed results keep entries as a lazy iterator, so only
+            # the pages that are actually read get requested
+            info = ydl.extract_info(playlist_url, download=False, process=False)
+            while info.get("_type") in ("url", "url_transparent"):
+                info = ydl.extract_info(
+                    info["url"],
+                    ie_key=info.get("ie_key"),
+                    download=False,
+                    process=False,
+                )
+            info.setdefault("webpage_url", playlist_url)
+            if not info.get("thumbnail"):
+                # Normally picked by yt-dlp's processing, which is skipped
+                info["thumbnail"] = entry_thumbnail_url(info, THUMBNAIL_SIZE[0])
+            if info.get("entries") is None:
+                return info  # Single video
+
+            known = {}
+            if cached is not None:
+                known = {e["id"]: e for e in cached["entries"] if e and e.get("id")}
+
+            # Entries read so far can be downloaded before extraction ends
+            entries = iter(info["entries"])
+            new_entries = []
+            header = {k: v for k, v in info.items() if k != "entries"}
+            self.current_playlist_info = dict(
+                header, entries=new_entries, original_url=playlist_url
+            )
+
+            pushed = 0
+            last_push = time.monotonic()
+            for entry in entries:
+                if known and entry and entry.get("id") in known:
+                    # Caught up with the cache; keep its entries from here
+                    new_ids = {e.get("id") for e in new_entries if e}
+                    tail = [
+                        e for e in cached["entries"] if e and e.get("id") not in new_ids
+                    ]
+                    count = info.get("playlist_count")
+                    if count is None or count == len(new_entries) + len(tail):
+                        new_entries.extend(tail)
+                        break
+                    # Entries were added elsewhere or removed; read the rest
+                    known = {}
+                new_entries.append(entry)
+                if on_entries and (
+                    len(new_entries) - pushed >= PLAYLIST_STREAM_BATCH
+                    or time.monotonic() - last_push >= PLAYLIST_STREAM_INTERVAL
+                ):
+                    on_entries(header, new_entries[pushed:])
+                    pushed = len(new_entries)
+                    last_push = time.monotonic()
+            if on_entries and pushed < len(new_entries):
+                on_entries(header, new_entries[pushed:])
+
+            info["entries"] = new_entries
+            return info
+
+    def download_playlist(
+        self,
+        playlist_url,
+        output_dir,
+        format_option,
+        selected_indices=None,
+        save_thumbnail=False,
+        max_workers=DEFAULT_MAX_WORKERS,
+        skip_existing=True,
+        resume_id=None,
+        job_id=None,
+        priority=DEFAULT_JOB_PRIORITY,
+        auto_tune=False,
+        selected_ids=None,
+    ):
+        """Download playlist videos, several at a time
+
+        Unless skip_existing is False, videos already downloaded to
+        output_dir in this format are left out before anything is fetched.
+        Pass the ID of an unfinished job as resume_id to continue it with
+        the items its manifest does not list as done. priority weights the
+        job's share of a bandwidth limit set on self.limiter. With auto_tune
+        the fragment concurrency is raised while that makes it faster (see
+        FragmentTuner), starting from what the last such job learned. A
+        new job is recorded under job_id, or a new ID when it is None.
+        Videos are picked by ID from selected_ids, or else by 0-based
+        position from selected_indices; IDs still find the checked videos
+        when the playlist changed after the job was queued.
+        """
+        if not playlist_url.strip():
+            if self.status_callback:
+                self.status_callback(STATUS_ERROR.format("Please enter a valid URL"))
+            return
+
+        # Normalize URL to handle both youtu.be and youtube.com formats
+        playlist_url = normalize_youtube_url(playlist_url)
+
+        job = self.manifest.job(resume_id) if resume_id else None
+        if job is not None:
+            # Everything needed was saved with the job; no extraction
+            _, params, items = job
+            title = params["title"]
+            entry_count = params["videos_count"]
+            index_width = params["index_width"]
+            videos_to_download = [(key, entry) for key, entry in items]
+        else:
+            # Resolve the playlist entries so each video can be fetched on its own
+            info = self.current_playlist_info
+            if not info or info.get("original_url") != playlist_url:
+                info = self.get_playlist_info(playlist_url)
+            if not info:
+                if self.status_callback:
+                    self.status_callback(
+                        {
+                            "status": STATUS_ERROR.format(
+                                "Could not load playlist information"
+                            ),
+                            "download_id": None,
+                        }
+                    )
+                return
+
+            entries = info.get("entries")
+            if entries is None:
+                # Single video URL
+                entries = [info]
+            entries = list(entries)
+            title = info.get("title", "Unknown Playlist")
+            entry_count = len(entries)
+
+            # Filter selected videos, remembering their position in the playlist
+            if selected_ids is not None:
+                wanted = set(selected_ids)
+                positions = [
+                    i
+                    for i, entry in enumerate(entries)
+                    if entry and entry.get("id") in wanted
+                ]
+            elif selected_indices and len(selected_indices) > 0:
+                positions = sorted(i for i in selected_indices if i < len(entries))
+            else:
+                positions = list(range(len(entries)))
+            videos_to_download = [(i + 1, entries[i]) for i in positions if entries[i]]
+
+            # yt-dlp pads %(playlist_index)s to the width of the last requested index
+            index_width = (
+                len(str(videos_to_download[-1][0])) if videos_to_download else 1
+            )
+
+        # Create a unique ID for this download
+        download_id = resume_id if job is not None else job_id or self.jobs.new_id()
+        # A JobQueue registers the job before it starts
+        download_job = self.jobs.register(download_id)
+        download_job.audio = is_audio_format(format_option)
+        self.limiter.add(download_id, priority)
+
+        # Create output directory if it doesn't exist
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir, exist_ok=True)
+
+        # Format selection
+        format_str = next(
+            (f for _, f in FORMAT_OPTIONS if f == format_option), FORMAT_OPTIONS[0][1]
+        )
+        if auto_tune:
+            download_job.tuner = FragmentTuner(
+                self.tuning.get(format_str)
+                or transfer_options(format_str)["concurrent_fragment_downloads"]
+            )
+
+        # Setup postprocessors; each file's conversion step is chosen once
+        # it is downloaded and its codecs are known
+        convert = file_conversion(format_option)
+        output_exists = existing_output(format_option)
+        postprocessors = [
+            {
+                "key": "FFmpegMetadata",
+                "add_metadata": True,
+            }
+        ]
+
+        # Leave out videos already downloaded here in this format
+        archive = DownloadArchive(output_dir, format_str)
+        selected_count = len(videos_to_download)
+        if skip_existing:
+            archive.scan_existing(entry for _, entry in videos_to_download)
+            videos_to_download = [
+                item for item in videos_to_download if item[1] not in archive
+            ]
+
+        if job is not None:
+            self.history.update(download_id, status="started")
+        else:
+            # Save to history
+            history_entry = {
+                "id": download_id,
+                "url": playlist_url,
+                "output_dir": output_dir,
+                "format": format_option,
+                "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "status": "started",
+                "title": title,
+                "videos_count": entry_count,
+                "playlist_items": format_playlist_items(positions),
+                # What was picked, by ID, as positions shift when the playlist
+                # changes; None when it was the whole playlist
+                "video_ids": (
+                    [entries[i].get("id") for i in positions]
+                    if len(positions) < len(entries)
+                    else None
+                ),
+                "skipped": selected_count - len(videos_to_download),
+            }
+            self.history.add(history_entry)
+
+            # Record every item before the first one starts
+            self.manifest.create(
+                download_id,
+                "playlist",
+                {
+                    "url": playlist_url,
+                    "output_dir": output_dir,
+                    "format": format_option,
+                    "save_thumbnail": save_thumbnail,
+                    "priority": priority,
+                    "auto_tune": auto_tune,
+                    "title": title,
+                    "videos_count": entry_count,
+                    "index_width": index_width,
+                },
+                [
+                    (playlist_index, self._manifest_entry(entry))
+                    for playlist_index, entry in videos_to_download
+                ],
+            )
+
+        # Download options shared by every video; one session per worker
+        ydl_opts = {
+            "format": format_str,
+            "outtmpl": os.path.join(output_dir, DEFAULT_OUTPUT_TEMPLATE),
+            "ignoreerrors": True,
+            "quiet": self.quiet,
+            "noprogress": self.quiet,
+            "writethumbnail": save_thumbnail,
+            "noplaylist": True,
+            "continuedl": True,
+            "merge_output_format": "mp4",  # Force merging to mp4 to prevent leftovers
+            "keepvideo": False,  # Don't keep separate video files
+            **transfer_options(format_str),
+        }
+        sessions = {}
+
+        def download_video(item, worker_id):
+            playlist_index, entry = item
+            video_url = entry.get("url") or entry.get("webpage_url") or entry.get("id")
+
+            # Keep the playlist numbering of the single-call download
+            output_template = DEFAULT_OUTPUT_TEMPLATE.replace(
+                "%(playlist_index)s", str(playlist_index).zfill(index_width)
+            )
+
+            if worker_id not in sessions:
+                sessions[worker_id] = YoutubeDLSession(ydl_opts, output_exists)
+            self._apply_tuning(download_id, sessions[worker_id], worker_id)
+            self._set_item_state(download_id, playlist_index, ITEM_DOWNLOADING)
+            retcode = self._download_item(
+                download_id,
+                sessions[worker_id],
+                video_url,
+                os.path.join(output_dir, output_template),
+                lambda d: self.update_progress(
+                    d, download_id, playlist_index, entry_count, worker_id
+                ),
+            )
+            return self._hand_off(
+                download_id,
+                playlist_index,
+                retcode,
+                sessions[worker_id].handoff.info,
+                postprocessors,
+                convert,
+                sessions[worker_id].skipped,
+                lambda: archive.add(entry),
+            )
+
+        # Start download
+        try:
+            # Update status
+            if self.status_callback:
+                self.status_callback(
+                    {"status": STATUS_DOWNLOADING, "download_id": download_id}
+                )
+
+            # Download
+            self._run_worker_pool(
+                download_id, videos_to_download, download_video, max_workers
+            )
+
+            # Check if download was stopped or completed
+            stats = self._record_conversions(download_job)
+            if download_job.control.stopped:
+                # Update history; a job stopped by the user is not resumed
+                self.history.update(download_id, status="stopped")
+                self.manifest.remove(download_id)
+
+                if self.status_callback:
+                    self.status_callback(
+                        {"status": STATUS_STOPPED, "download_id": download_id, **stats}
+                    )
+            else:
+                self._report_finished(download_job, stats)
+
+        except Exception as e:
+            error_message = str(e)
+
+            # Update history
+            self.history.update(download_id, status="error", error=error_message)
+
+            if self.status_callback:
+                self.status_callback(
+                    {
+                        "status": STATUS_ERROR.format(error_message),
+                        "download_id": download_id,
+                    }
+                )
+
+        finally:
+            # Clean up
+            for session in sessions.values():
+                session.close()
+            self.jobs.remove(download_id)
+            self.limiter.remove(download_id)
+            self._record_conversions(download_job)
+            self._save_tuning(download_job, format_str)
+
+    def resume_job(self, job_id, max_workers=DEFAULT_MAX_WORKERS):
+        """Continue an unfinished job at its first item that is not done"""
+        job = self.manifest.job(job_id)
+        if job is None:
+            return
+        kind, params, _ = job
+        if kind == "csv":
+            self.download_from_csv(
+                None,
+                params["output_dir"],
+                params["format"],
+                save_thumbnail=params["save_thumbnail"],
+                max_workers=max_workers,
+                resume_id=job_id,
+                priority=params.get("priority", DEFAULT_JOB_PRIORITY),
+                auto_tune=params.get("auto_tune", False),
+            )
+        else:
+            self.download_playlist(
+                params["url"],
+                params["output_dir"],
+                params["format"],
+                save_thumbnail=params["save_thumbnail"],
+                max_workers=max_workers,
+                resume_id=job_id,
+                priority=params.get("priority", DEFAULT_JOB_PRIORITY),
+                auto_tune=params.get("auto_tune", False),
+            )
+
+    def discard_job(self, job_id):
+        """Forget an unfinished job instead of resuming it"""
+        self.manifest.remove(job_id)
+        self.history.update(job_id, status="stopped")
+
+    @staticmethod
+    def _manifest_entry(entry):
+        """The fields of a playlist entry needed to download it later"""
+        return {
+            key: entry[key]
+            for key in ("id", "ie_key", "title", "url", "webpage_url")
+            if entry.get(key)
+        }
+
+    def _run_worker_pool(self, download_id, items, worker, max_workers):
+        """Run worker(item, worker_id) for every item on a pool of threads
+
+        Workers pull items from a shared queue, so a slow video never holds
+        up the rest. No new item is started once the download is stopped,
+        and paused workers wait before picking up the next one. The first
+        unexpected worker error is re-raised after all workers finished.
+
+        items are (index, ...) pairs. A worker may return the Future of work
+        it handed off, such as post-processing; the item is done once that
+        resolves, and the pool waits for it. A "video_done" status with the
+        running "k of N" count is reported after every item.
+        """
+        work_queue = Queue()
+        for item in items:
+            work_queue.put(item)
+
+        worker_count = max(1, min(max_workers, len(items)))
+        download_job = self.jobs[download_id]
+        download_job.begin([item[0] for item in items], worker_count)
+
+        errors = []
+        handed_off = []
+        lock = Lock()
+
+        control = download_job.control
+
+        def item_done(item, worker_id):
+            completed = download_job.item_done()
+            if self.status_callback:
+                self.status_callback(
+                    {
+                        "status": "video_done",
+                        "download_id": download_id,
+                        "worker_id": worker_id,
+                        "playlist_index": item[0],
+                        "videos_completed": completed,
+                        "videos_total": download_job.total,
+                    }
+                )
+
+        def worker_loop(worker_id):
+            _worker_controls[get_ident()] = control
+            try:
+                work(worker_id)
+            finally:
+                del _worker_controls[get_ident()]
+
+        def work(worker_id):
+            # Wait here while paused instead of starting a new item
+            while control.wait_while_paused():
+                try:
+                    item = work_queue.get_nowait()
+                except Empty:
+                    return
+
+                try:
+                    pending = worker(item, worker_id)
+                except Exception as e:
+                    with lock:
+                        errors.append(e)
+                    control.stop()
+                    return
+
+                if pending is None:
+                    item_done(item, worker_id)
+                else:
+                    with lock:
+                        handed_off.append(pending)
+                    pending.add_done_callback(
+                        lambda _, item=item, worker_id=worker_id: item_done(
+                            item, worker_id
+                        )
+                    )
+
+        threads = [
+            Thread(target=worker_loop, args=(worker_id,), daemon=True)
+            for worker_id in range(1, worker_count + 1)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for pending in handed_off:
+            try:
+                pending.result()
+            except Exception as e:
+                errors.append(e)
+
+        if errors:
+            raise errors[0]
+
+    def download_from_csv(
+        self,
+        csv_videos,
+        output_dir,
+        format_option,
+        selected_indices=None,
+        save_thumbnail=False,
+        max_workers=DEFAULT_MAX_WORKERS,
+        skip_existing=True,
+        resume_id=None,
+        job_id=None,
+        priority=DEFAULT_JOB_PRIORITY,
+        auto_tune=False,
+    ):
+        """Download videos from CSV list, several rows at a time
+
+        Pass the ID of an unfinished job as resume_id to continue it with
+        the rows its manifest does not list as done; csv_videos is then
+        not used. See download_playlist for job_id, priority and auto_tune.
+        """
+        job = self.manifest.job(resume_id) if resume_id else None
+        if job is None and not csv_videos:
+            if self.status_callback:
+                self.status_callback(STATUS_ERROR.format("No videos found in CSV"))
+            return
+
+        # Create a unique ID for this download
+        download_id = resume_id if job is not None else job_id or self.jobs.new_id()
+        # A JobQueue registers the job before it starts
+        download_job = self.jobs.register(download_id)
+        download_job.audio = is_audio_format(format_option)
+        self.limiter.add(download_id, priority)
+
+        # Create output directory if it doesn't exist
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir, exist_ok=True)
+
+        # Format selection
+        format_str = next(
+            (f for _, f in FORMAT_OPTIONS if f == format_option), FORMAT_OPTIONS[0][1]
+        )
+        if auto_tune:
+            download_job.tuner = FragmentTuner(
+                self.tuning.get(format_str)
+                or transfer_options(format_str)["concurrent_fragment_downloads"]
+            )
+
+        # Setup postprocessors; each file's conversion step is chosen once
+        # it is downloaded and its codecs are known
+        convert = file_conversion(format_option)
+        output_exists = existing_output(format_option)
+        postprocessors = [
+            {
+                "key": "FFmpegMetadata",
+                "add_metadata": True,
+            }
+        ]
+
+        if job is not None:
+            _, params, items = job
+            video_count = params["videos_count"]
+        else:
+            # Filter selected videos
+            videos_to_download = csv_videos
+            if selected_indices and len(selected_indices) > 0:
+                videos_to_download = [
+                    csv_videos[i] for i in selected_indices if i < len(csv_videos)
+                ]
+            items = list(enumerate(videos_to_download, 1))
+            video_count = len(items)
+
+        # Leave out videos already downloaded here in this format. Files are
+        # named by the video's own title, which the CSV title need not be,
+        # so they are matched by ID here and by title once it is extracted.
+        archive = DownloadArchive(output_dir, format_str)
+        archive_entries = {
+            video["row_number"]: {
+                "ie_key": "Youtube",
+                "id": youtube_video_id(video["url"]),
+            }
+            for _, video in items
+        }
+        selected_count = len(items)
+        if skip_existing:
+            archive.scan_existing(archive_entries.values())
+            items = [
+                (idx, video)
+                for idx, video in items
+                if archive_entries[video["row_number"]] not in archive
+            ]
+            if archive.titles:
+                converted_exists = output_exists
+
+                def output_exists(filename):
+                    return archive.has_file(filename) or bool(
+                        converted_exists and converted_exists(filename)
+                    )
+
+        if job is not None:
+            self.history.update(download_id, status="started")
+        else:
+            # Save to history
+            history_entry = {
+                "id": download_id,
+                "url": "CSV Playlist",
+                "output_dir": output_dir,
+                "format": format_option,
+                "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "status": "started",
+                "title": "CSV Playlist",
+                "videos_count": len(items),
+                "skipped": selected_count - len(items),
+            }
+            self.history.add(history_entry)
+
+            # Record every row before the first one starts
+            self.manifest.create(
+                download_id,
+                "csv",
+                {
+                    "output_dir": output_dir,
+                    "format": format_option,
+                    "save_thumbnail": save_thumbnail,
+                    "priority": priority,
+                    "auto_tune": auto_tune,
+                    "videos_count": video_count,
+                },
+                items,
+            )
+
+        # Update status
+        if self.status_callback:
+            self.status_callback(
+                {"status": STATUS_DOWNLOADING, "download_id": download_id}
+            )
+
+        # Download options shared by every row; one session per worker
+        ydl_opts = {
+            "format": format_str,
+            "outtmpl": os.path.join(output_dir, "%(title)s.%(ext)s"),
+            "ignoreerrors": True,
+            "quiet": self.quiet,
+            "noprogress": self.quiet,
+            "writethumbnail": save_thumbnail,
+            "noplaylist": True,
+            "continuedl": True,
+            "merge_output_format": "mp4",
+            "keepvideo": False,
+            **transfer_options(format_str),
+        }
+        sessions = {}
+
+        def download_video(item, worker_id):
+            idx, video = item
+
+            # Custom output template with row number
+            output_template = f"{video['row_number']}. %(title)s.%(ext)s"
+
+            # Download the video on this worker's session
+            if worker_id not in sessions:
+                sessions[worker_id] = YoutubeDLSession(ydl_opts, output_exists)
+            self._apply_tuning(download_id, sessions[worker_id], worker_id)
+            self._set_item_state(download_id, idx, ITEM_DOWNLOADING)
+            retcode = self._download_item(
+                download_id,
+                sessions[worker_id],
+                video["url"],
+                os.path.join(output_dir, output_template),
+                lambda d: self.update_progress(
+                    d, download_id, idx, video_count, worker_id
+                ),
+            )
+            return self._hand_off(
+                download_id,
+                idx,
+                retcode,
+                sessions[worker_id].handoff.info,
+                postprocessors,
+                convert,
+                sessions[worker_id].skipped,
+                lambda: archive.add(archive_entries[video["row_number"]]),
+            )
+
+        # Download the videos on the worker pool
+        try:
+            self._run_worker_pool(download_id, items, download_video, max_workers)
+
+            # Check if download was stopped
+            stats = self._record_conversions(download_job)
+            if download_job.control.stopped:
+                # Update history; a job stopped by the user is not resumed
+                self.history.update(download_id, status="stopped")
+                self.manifest.remove(download_id)
+
+                if self.status_callback:
+                    self.status_callback(
+                        {"status": STATUS_STOPPED, "download_id": download_id, **stats}
+                    )
+                return
+
+            self._report_finished(download_job, stats)
+
+        except Exception as e:
+            error_message = str(e)
+
+            # Update history
+            self.history.update(download_id, status="error", error=error_message)
+
+            if self.status_callback:
+                self.status_callback(
+                    {
+                        "status": STATUS_ERROR.format(error_message),
+                        "download_id": download_id,
+                    }
+                )
+
+        finally:
+            # Clean up
+            for session in sessions.values():
+                session.close()
+            self.jobs.remove(download_id)
+            self.limiter.remove(download_id)
+            self._record_conversions(download_job)
+            self._save_tuning(download_job, format_str)
+
+    def update_progress(
+        self, d, download_id, video_index=None, video_count=None, worker_id=None
+    ):
+        """Progress hook shared by playlist and CSV downloads
+
+        yt-dlp calls this many times per second per stream, so it only keeps
+        an EWMA of the speed on every call and publishes a "downloading"
+        event at most progress_hz times per second per worker. Events carry
+        raw numbers (bytes, bytes/s, seconds); formatting them is left to
+        the consumer.
+        """
+        download_job = self.jobs.get(download_id)
+        if download_job is None:
+            return
+        control = download_job.control
+        slot = worker_id or 0
+        status = d.get("status")
+        if status == "downloading" and self.limiter.limited:
+            self._throttle(d, download_job, slot)
+        if control.stopped or control.paused:
+            # Abort the transfer; a paused one is continued from its .part
+            # file once resumed, so no connection is held open meanwhile.
+            # yt-dlp takes this as a cancellation, not as an error.
+            from yt_dlp.utils import DownloadCancelled
+
+            raise DownloadCancelled("Download paused or stopped by user")
+
+        if status == "downloading":
+            # Smooth the speed over the recent samples in O(1)
+            speed = d.get("speed")
+            if speed:
+                average = download_job.speeds[slot]
+                download_job.speeds[slot] = (
+                    speed
+                    if not average
+                    else average + PROGRESS_SPEED_SMOOTHING * (speed - average)
+                )
+
+            # Sample at a fixed rate instead of on every callback
+            now = time.monotonic()
+            if now - download_job.last_events[slot] < self.progress_interval:
+                return
+            download_job.last_events[slot] = now
+
+            if self.status_callback:
+                downloaded_bytes = d.get("downloaded_bytes") or 0
+                total_bytes = d.get("total_bytes") or d.get("total_bytes_estimate")
+                info_dict = d.get("info_dict") or {}
+                self.status_callback(
+                    {
+                        "status": "downloading",
+                        "download_id": download_id,
+                        "filename": d.get("filename"),
+                        "progress": (
+                            downloaded_bytes / total_bytes if total_bytes else 0
+                        ),
+                        "speed": download_job.speeds[slot] or None,
+                        "eta": d.get("eta"),
+                        "downloaded_bytes": downloaded_bytes,
+                        "total_bytes": total_bytes,
+                        "playlist_index": video_index
+                        or info_dict.get("playlist_index", 0),
+                        "playlist_count": video_count or info_dict.get("n_entries", 0),
+                        "worker_id": worker_id,
+                        "videos_completed": download_job.completed,
+                        "videos_total": download_job.total,
+                    }
+                )
+
+        elif status == "finished":
+            # Video download finished, now processing
+            download_job.transferred[slot] = -1
+            tuner = download_job.tuner
+            if tuner is not None:
+                tuner.record(
+                    worker_id,
+                    d.get("total_bytes") or d.get("downloaded_bytes"),
+                    d.get("elapsed"),
+                )
+            if video_index is not None:
+                self._set_item_state(download_id, video_index, ITEM_PROCESSING)
+            if self.status_callback:
+                info_dict = d.get("info_dict") or {}
+                self.status_callback(
+                    {
+                        "status": "processing",
+                        "download_id": download_id,
+                        "filename": d.get("filename"),
+                        "playlist_index": video_index
+                        or info_dict.get("playlist_index", 0),
+                        "playlist_count": video_count or info_dict.get("n_entries", 0),
+                        "worker_id": worker_id,
+                        "videos_completed": download_job.completed,
+                        "videos_total": download_job.total,
+                    }
+                )
+
+    def _throttle(self, d, download_job, slot):
+        """Hold a transfer back while its job is over its bandwidth share"""
+        downloaded = d.get("downloaded_bytes") or 0
+        previous = download_job.transferred[slot]
+        download_job.transferred[slot] = downloaded
+        # The first report of a file also counts bytes resumed from .part
+        if previous >= 0 and downloaded > previous:
+            self.limiter.consume(
+                download_job.id, downloaded - previous, download_job.control
+            )
+
+    def stop_download(self, download_id):
+        """Stop a specific download, including any running conversion"""
+        download_job = self.jobs.get(download_id)
+        if download_job is None:
+            return False
+        download_job.control.stop()
+        self.limiter.wake()
+        self.postprocessing.wake()
+        return True
+
+    def pause_download(self, download_id):
+        """Pause a specific download"""
+        download_job = self.jobs.get(download_id)
+        if download_job is None:
+            return False
+        download_job.control.pause()
+        self.limiter.wake()
+        if self.status_callback:
+            self.status_callback({"status": STATUS_PAUSED, "download_id": download_id})
+        return True
+
+    def resume_download(self, download_id):
+        """Resume a specific download"""
+        download_job = self.jobs.get(download_id)
+        if download_job is None:
+            return False
+        download_job.control.resume()
+        return True
+
+    def _hand_off(
+        self,
+        download_id,
+        video_index,
+        retcode,
+        info,
+        postprocessors,
+        convert,
+        skipped,
+        on_done,
+    ):
+        """Queue a downloaded file for post-processing; return the Future
+
+        A failed download is recorded as failed right away and None is
+        returned, as for a video skipped because its converted file was
+        already there. convert(info) chooses the conversion that comes
+        before postprocessors (see file_conversion). on_done is called once
+        the file is post-processed.
+        """
+        if retcode == 0 and skipped:
+            now = time.monotonic()
+            self.jobs[download_id].log_conversion(
+                video_index, CONVERT_EXISTING, now, now
+            )
+            on_done()
+            self._set_item_state(download_id, video_index, ITEM_DONE)
+            return None
+
+        future = None
+        if retcode == 0 and info is not None:
+            future = self.postprocessing.submit(
+                self._post_process,
+                download_id,
+                video_index,
+                info,
+                postprocessors,
+                convert,
+                on_done,
+                control=self.jobs[download_id].control,
+            )
+        if future is None:
+            self._set_item_state(download_id, video_index, ITEM_FAILED)
+        return future
+
+    def _post_process(
+        self, download_id, video_index, info, postprocessors, convert, on_done
+    ):
+        """Run the post-processor chain on a downloaded file (pool thread)"""
+        download_job = self.jobs[download_id]
+        control = download_job.control
+        state = ITEM_FAILED
+        if not control.stopped:
+            # Register with the job so stopping it kills ffmpeg (and ffprobe)
+            _worker_controls[get_ident()] = control
+            try:
+                started = time.monotonic()
+                conversion, steps = convert(info)
+                if steps is None:
+                    # The output is already there; drop the new download
+                    os.remove(info["filepath"])
+                else:
+                    self._postprocessor(steps + postprocessors).post_process(
+                        info["filepath"], info
+                    )
+                download_job.log_conversion(
+                    video_index, conversion, started, time.monotonic()
+                )
+                on_done()
+                state = ITEM_DONE
+            except Exception as e:
+                if not control.stopped:
+                    print(
+                        f"Error post-processing {info.get('filepath')}: {e}",
+                        file=sys.stderr,
+                    )
+            finally:
+                del _worker_controls[get_ident()]
+        self._set_item_state(download_id, video_index, state)
+
+    def _report_finished(self, download_job, stats):
+        """Record a job that ran to its end, and whether any videos failed"""
+        failed = download_job.failed
+        if failed:
+            self.history.update(download_job.id, status="incomplete", failed=failed)
+            status = STATUS_INCOMPLETE.format(failed, download_job.total)
+        else:
+            self.history.update(download_job.id, status="completed")
+            status = STATUS_COMPLETE
+        self.manifest.remove(download_job.id)
+
+        if self.status_callback:
+            self.status_callback(
+                {
+                    "status": status,
+                    "download_id": download_job.id,
+                    "failed": failed,
+                    **stats,
+                }
+            )
+
+    def _set_item_state(self, download_id, key, state):
+        """Record an item's state on its job and, if it changed, in the manifest"""
+        download_job = self.jobs.get(download_id)
+        if download_job is None or download_job.set_state(key, state):
+            self.manifest.set_state(download_id, key, state)
+
+    def _record_conversions(self, download_job):
+        """Save how each file of a job was converted, and how long it took
+
+        Returns the fields to add to the job's final status: the throughput
+        in tracks per second, for audio jobs. A job is only recorded once.
+        """
+        first, last = download_job.first_conversion, download_job.last_conversion
+        if first is None:
+            return {}
+        download_job.first_conversion = None
+        converted = download_job.converted()
+        entry = self.history.get(download_job.id) or {}
+        recorded = dict(entry.get("conversions") or {})
+        recorded.update(converted)
+        fields = {}
+        if download_job.audio and last > first:
+            fields["tracks_per_second"] = round(len(converted) / (last - first), 2)
+        self.history.update(download_job.id, conversions=recorded, **fields)
+        return fields
+
+    def _postprocessor(self, postprocessors):
+        """This pool thread's YoutubeDL running the given post-processors"""
+        import yt_dlp
+
+        ydls = self._postprocessors.__dict__.setdefault("ydls", {})
+        key = json.dumps(postprocessors, sort_keys=True)
+        if key not in ydls:
+            ydls[key] = yt_dlp.YoutubeDL(  # type: ignore
+                {
+                    "postprocessors": postprocessors,
+                    "quiet": self.quiet,
+                    "keepvideo": False,
+                }
+            )
+        return ydls[key]
+
+    def _apply_tuning(self, download_id, session, worker_id):
+        """Set a session to the fragment level the job's tuner is trying"""
+        tuner = self.jobs[download_id].tuner
+        if tuner is not None:
+            session.set_option("concurrent_fragment_downloads", tuner.start(worker_id))
+
+    def _save_tuning(self, download_job, format_option):
+        """Keep the fastest fragment level a job measured for the next one"""
+        tuner = download_job.tuner
+        if tuner is not None and tuner.best is not None:
+            self.tuning.put(format_option, *tuner.best)
+
+    def _download_item(self, download_id, session, url, outtmpl, progress_hook):
+        """Download one URL, continuing it when a pause aborted it
+
+        Returns 0 if the last attempt downloaded the file without error and
+        handed it off, or skipped it, else 1. A transfer that a pause
+        cancelled is continued once the job is resumed.
+        """
+        from yt_dlp.utils import DownloadCancelled
+
+        control = self.jobs[download_id].control
+        while True:
+            try:
+                retcode = session.download(url, outtmpl, progress_hook)
+            except DownloadCancelled:
+                retcode = 1
+            if retcode == 0 and (session.handoff.info is not None or session.skipped):
+                return 0
+            if not control.paused or not control.wait_while_paused():
+                return 1
+
+
+class JobQueue:
+    """Playlist and CSV jobs downloaded in order, up to `slots` at a time
+
+    The queue is kept in the history database, so it survives restarts;
+    jobs that were queued or running when the app exited come back paused.
+    A job leaves the queue once its download returns, and the history has
+    the outcome. Running jobs split `workers` video workers evenly and
+    share the manager's bandwidth limit and post-processing pool; paused
+    ones give up their slot. on_change() is called, from any thread, after
+    every change.
+    """
+
+    def __init__(
+        self,
+        manager,
+        slots=QUEUE_SLOTS,
+        workers=QUEUE_WORKERS,
+        db_path=HISTORY_DB_PATH,
+        on_change=None,
+    ):
+        import sqlite3
+
+        self.manager = manager
+        self.slots = slots
+        self.workers = workers
+        self.on_change = on_change
+        self._lock = Lock()
+        self._idle = Condition(self._lock)
+        self._jobs = {}  # job_id -> {kind, title, params, state, position}
+        self._threads = {}  # job_id -> Thread of a job that was started
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_queue (
+                    job_id TEXT PRIMARY KEY,
+                    position INTEGER NOT NULL,
+                    kind TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    state TEXT NOT NULL
+                )
+                """)
+            self._conn.execute("UPDATE job_queue SET state = ?", (QUEUE_PAUSED,))
+            for job_id, position, kind, title, params, state in self._conn.execute(
+                "SELECT job_id, position, kind, title, params, state FROM job_queue"
+            ):
+                self._jobs[job_id] = {
+                    "kind": kind,
+                    "title": title,
+                    "params": json.loads(params),
+                    "state": state,
+                    "position": position,
+                }
+
+    def add(self, kind, title, params):
+        """Queue a "playlist" or "csv" job; return its ID
+
+        params are the keyword arguments of download_playlist or
+        download_from_csv, apart from max_workers and job_id.
+        """
+        with self._lock:
+            job_id = self.manager.jobs.new_id()
+            while job_id in self._jobs:
+                job_id = self.manager.jobs.new_id()
+            self._insert(job_id, kind, title, params)
+            self._schedule()
+        self._changed()
+        return job_id
+
+    def adopt(self, job_id, title):
+        """Queue an unfinished job of the manifest, paused until resumed"""
+        saved = self.manager.manifest.params(job_id) or {}
+        params = {"priority": saved["priority"]} if "priority" in saved else {}
+        with self._lock:
+            if job_id not in self._jobs:
+                self._insert(job_id, "resume", title, params, QUEUE_PAUSED)
+        self._changed()
+
+    def jobs(self):
+        """Return the queued jobs in order, as dicts with an "id" key"""
+        with self._lock:
+            return [
+                {"id": job_id, **job, "started": job_id in self._threads}
+                for job_id, job in self._ordered()
+            ]
+
+    def __contains__(self, job_id):
+        return job_id in self._jobs
+
+    def move(self, job_id, offset):
+        """Move a job offset places up (negative) or down the queue"""
+        with self._lock:
+            order = [job_id for job_id, _ in self._ordered()]
+            if job_id not in order:
+                return
+            index = order.index(job_id)
+            target = max(0, min(index + offset, len(order) - 1))
+            if target == index:
+                return
+            order.insert(target, order.pop(index))
+            with self._conn:
+                for position, other in enumerate(order):
+                    self._jobs[other]["position"] = position
+                    self._conn.execute(
+                        "UPDATE job_queue SET position = ? WHERE job_id = ?",
+                        (position, other),
+                    )
+            self._schedule()
+        self._changed()
+
+    def pause(self, job_id):
+        """Hold a waiting job, or pause a running one and free its slot"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["state"] == QUEUE_PAUSED:
+                return
+            if job_id in self._threads:
+                self.manager.pause_download(job_id)
+            self._set_state(job_id, QUEUE_PAUSED)
+            self._schedule()
+        self._changed()
+
+    def resume(self, job_id):
+        """Queue a paused job again; it continues once it gets a free slot"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["state"] != QUEUE_PAUSED:
+                return
+            self._set_state(job_id, QUEUE_WAITING)
+            self._schedule()
+        self._changed()
+
+    def stop(self, job_id):
+        """Stop a job; one that was not started is dropped from the queue"""
+        with self._lock:
+            if job_id not in self._jobs:
+                return
+            if job_id in self._threads:
+                # The job's thread takes it off the queue when it returns
+                self.manager.stop_download(job_id)
+                return
+            self._delete(job_id)
+        if self.manager.manifest.job(job_id) is not None:
+            self.manager.discard_job(job_id)
+        self._changed()
+
+    def set_priority(self, job_id, priority):
+        """Weight a job's share of the bandwidth limit, also while it runs"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job["params"]["priority"] = priority
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE job_queue SET params = ? WHERE job_id = ?",
+                    (json.dumps(job["params"]), job_id),
+                )
+            if job_id in self._threads:
+                self.manager.limiter.set_priority(job_id, priority)
+        self._changed()
+
+    def set_slots(self, slots):
+        """Change how many jobs run at the same time"""
+        with self._lock:
+            self.slots = max(1, slots)
+            self._schedule()
+        self._changed()
+
+    def join(self, timeout=None):
+        """Wait until no job is waiting or running; return whether none is"""
+        with self._lock:
+            return self._idle.wait_for(
+                lambda: all(
+                    job["state"] == QUEUE_PAUSED for job in self._jobs.values()
+                ),
+                timeout,
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _ordered(self):
+        return sorted(self._jobs.items(), key=lambda item: item[1]["position"])
+
+    def _insert(self, job_id, kind, title, params, state=QUEUE_WAITING):
+        position = max((job["position"] for job in self._jobs.values()), default=-1)
+        self._jobs[job_id] = {
+            "kind": kind,
+            "title": title,
+            "params": params,
+            "state": state,
+            "position": position + 1,
+        }
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_queue "
+                "(job_id, position, kind, title, params, state) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, position + 1, kind, title, json.dumps(params), state),
+            )
+
+    def _set_state(self, job_id, state):
+        self._jobs[job_id]["state"] = state
+        with self._conn:
+            self._conn.execute(
+                "UPDATE job_queue SET state = ? WHERE job_id = ?", (state, job_id)
+            )
+
+    def _delete(self, job_id):
+        self._jobs.pop(job_id, None)
+        self._threads.pop(job_id, None)
+        with self._conn:
+            self._conn.execute("DELETE FROM job_queue WHERE job_id = ?", (job_id,))
+        self._idle.notify_all()
+
+    def _schedule(self):
+        """Start waiting jobs in queue order while a slot is free"""
+        running = sum(job["state"] == QUEUE_RUNNING for job in self._jobs.values())
+        for job_id, job in self._ordered():
+            if running >= self.slots:
+                break
+            if job["state"] != QUEUE_WAITING:
+                continue
+            self._set_state(job_id, QUEUE_RUNNING)
+            running += 1
+            if job_id in self._threads:
+                # Paused after it started; it continues where it stopped
+                self.manager.resume_download(job_id)
+                continue
+            # Registered now, so the job can be paused or stopped while its
+            # playlist is still being loaded, and its priority changed
+            self.manager.jobs.register(job_id)
+            if "priority" in job["params"]:
+                self.manager.limiter.set_priority(job_id, job["params"]["priority"])
+            thread = Thread(
+                target=self._run,
+                args=(job_id, job["kind"], job["params"]),
+                daemon=True,
+            )
+            self._threads[job_id] = thread
+            thread.start()
+        self._idle.notify_all()
+
+    def _run(self, job_id, kind, params):
+        workers = max(1, self.workers // self.slots)
+        try:
+            if kind == "resume" or self.manager.manifest.job(job_id) is not None:
+                self.manager.resume_job(job_id, workers)
+            elif kind == "csv":
+                self.manager.download_from_csv(
+                    max_workers=workers, job_id=job_id, **params
+                )
+            else:
+                self.manager.download_playlist(
+                    max_workers=workers, job_id=job_id, **params
+                )
+        except Exception as e:
+            print(f"Error running queued job {job_id}: {e}", file=sys.stderr)
+        finally:
+            self.manager.jobs.remove(job_id)
+            self.manager.limiter.remove(job_id)
+            with self._lock:
+                self._delete(job_id)
+                self._schedule()
+            self._changed()
+
+    def _changed(self):
+        if self.on_change:
+            self.on_change()
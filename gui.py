@@ -0,0 +1,2121 @@
+import importlib
+import os
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+from threading import Thread
+from collections import OrderedDict
+import sys
+import subprocess
+import platform
+
+from downloader import (
+    CONVERT_EXISTING,
+    CONVERT_NONE,
+    CONVERT_REMUX,
+    CONVERT_TRANSCODE,
+    CSV_FILE_NAME,
+    CSV_FILE_PATH,
+    DEFAULT_JOB_PRIORITY,
+    DEFAULT_OUTPUT_DIR,
+    DEFAULT_STATUS,
+    FORMAT_OPTIONS,
+    QUEUE_PAUSED,
+    QUEUE_RUNNING,
+    QUEUE_SLOTS,
+    STATUS_COMPLETE,
+    STATUS_DOWNLOADING,
+    STATUS_ERROR,
+    STATUS_INCOMPLETE,
+    STATUS_PAUSED,
+    STATUS_PREVIEWING,
+    STATUS_READY,
+    STATUS_STOPPED,
+    DownloadManager,
+    JobQueue,
+    StatusEventQueue,
+    ThumbnailCache,
+    ThumbnailPrefetcher,
+    entry_thumbnail_url,
+    VideoSelection,
+    format_size,
+    format_time,
+    normalize_youtube_url,
+    parse_playlist_items,
+    parse_rate,
+    parse_time_window,
+    read_csv_playlist,
+)
+
+# ===== Configuration settings =====
+# GUI settings
+APP_TITLE = "YouTube Playlist Downloader"
+WINDOW_WIDTH = 700
+WINDOW_HEIGHT = 800
+PADDING = 10
+YOUTUBE_RED = "#FF0000"
+YOUTUBE_WHITE = "#FFFFFF"
+YOUTUBE_DARK = "#000000"  # Changed to black
+YOUTUBE_LIGHT_GRAY = "#F5F5F5"
+YOUTUBE_GRAY = "#000000"  # Changed to black
+BUTTON_TEXT_COLOR = "#000000"  # Text color for all buttons
+FONT_FAMILY = "Segoe UI" if sys.platform == "win32" else "Helvetica"
+FONT_SIZE_SMALL = 9
+FONT_SIZE_NORMAL = 10
+FONT_SIZE_LARGE = 12
+FONT_SIZE_TITLE = 14
+YT_DLP_WARMUP_DELAY_MS = 500  # Import yt-dlp this long after the window shows
+HISTORY_PAGE_SIZE = 50  # History entries loaded at a time
+HISTORY_PREFETCH_FRACTION = 0.9  # Load the next page once scrolled this far
+HISTORY_CARD_LIMIT = 3 * HISTORY_PAGE_SIZE  # Most history cards kept at once
+HISTORY_FILTER_DELAY_MS = 300  # Wait for typing to pause before filtering
+HISTORY_ALL_STATUSES = "All"
+HISTORY_STATUS_FILTERS = [
+    HISTORY_ALL_STATUSES,
+    "started",
+    "completed",
+    "incomplete",
+    "stopped",
+    "error",
+]
+VIDEO_ROW_HEIGHT = 44  # Height of one row in the playlist video list
+ROW_THUMBNAIL_SIZE = (56, 32)
+ROW_THUMBNAIL_LIMIT = 200  # Row thumbnail images kept in memory
+UI_REFRESH_MS = 50  # Status events are applied to the UI at most 20 times/sec
+JOB_TITLE_WIDTH = 40  # Characters of a job's title shown in the jobs panel
+MAX_QUEUE_SLOTS = 8  # Highest "Parallel jobs" choice
+MAX_JOB_PRIORITY = 5  # Highest share of the speed limit a job can be given
+RESUME_PROMPT_DELAY_MS = 300  # Ask about unfinished downloads once the window shows
+DEFAULT_FULL_SPEED_WINDOW = ("22:00", "06:00")  # Suggested no-limit hours
+
+# Text labels
+LABEL_PLAYLIST_URL = "Playlist URL"
+LABEL_OUTPUT_DIR = "Save to"
+BUTTON_DOWNLOAD = "Download"
+BUTTON_STOP = "Cancel"
+BUTTON_PAUSE = "Pause"
+BUTTON_RESUME = "Resume"
+BUTTON_BROWSE = "Browse..."
+
+
+def load_thumbnail(path):
+    """Create a Tk image from a thumbnail in the cache"""
+    from PIL import Image, ImageTk
+
+    try:
+        with Image.open(path) as img:
+            return ImageTk.PhotoImage(img)
+    except Exception as e:
+        print(f"Error loading thumbnail: {e}")
+        return None
+
+
+def format_conversions(conversions):
+    """Summarize how the files of a job were converted, e.g. "3 remuxed (4 sec)" """
+    totals = {}
+    for conversion, seconds in conversions.values():
+        count, total = totals.get(conversion, (0, 0.0))
+        totals[conversion] = (count + 1, total + seconds)
+    parts = []
+    for conversion, verb in (
+        (CONVERT_NONE, "kept as is"),
+        (CONVERT_REMUX, "remuxed"),
+        (CONVERT_TRANSCODE, "transcoded"),
+        (CONVERT_EXISTING, "already there"),
+    ):
+        if conversion in totals:
+            count, total = totals[conversion]
+            parts.append(f"{count} {verb} ({format_time(total)})")
+    return ", ".join(parts)
+
+
+def open_csv_file():
+    """Open the CSV file with the default application"""
+    try:
+        if platform.system() == "Windows":
+            os.startfile(CSV_FILE_PATH)
+        elif platform.system() == "Darwin":  # macOS
+            subprocess.run(["open", CSV_FILE_PATH])
+        else:  # Linux
+            subprocess.run(["xdg-open", CSV_FILE_PATH])
+    except Exception as e:
+        messagebox.showerror("Error", f"Could not open CSV file: {e}")
+
+
+class YouTubeFrame(ttk.Frame):
+    """Custom frame with YouTube styling"""
+
+    def __init__(self, parent, **kwargs):
+        bg_color = kwargs.pop("bg", YOUTUBE_WHITE)
+        super().__init__(parent, style="YouTube.TFrame", **kwargs)
+        style = ttk.Style()
+        style.configure("YouTube.TFrame", background=bg_color)
+
+
+class YouTubeLabel(ttk.Label):
+    """Custom label with YouTube styling"""
+
+    def __init__(self, parent, **kwargs):
+        font_size = kwargs.pop("font_size", FONT_SIZE_NORMAL)
+        fg_color = kwargs.pop("fg", YOUTUBE_DARK)
+        bg_color = kwargs.pop("bg", YOUTUBE_WHITE)
+        font_weight = kwargs.pop("font_weight", "normal")
+        super().__init__(parent, style="YouTube.TLabel", **kwargs)
+        style = ttk.Style()
+        style.configure(
+            "YouTube.TLabel",
+            font=(FONT_FAMILY, font_size, font_weight),
+            foreground=fg_color,
+            background=bg_color,
+        )
+
+
+class YouTubeButton(ttk.Button):
+    """Custom button with YouTube styling"""
+
+    def __init__(self, parent, **kwargs):
+        button_type = kwargs.pop("button_type", "primary")
+        super().__init__(parent, style=f"YouTube.{button_type}.TButton", **kwargs)
+        style = ttk.Style()
+
+        # Primary button (Red)
+        style.configure(
+            "YouTube.primary.TButton",
+            font=(FONT_FAMILY, FONT_SIZE_NORMAL, "bold"),
+            foreground=YOUTUBE_WHITE,
+            background=YOUTUBE_RED,
+        )
+
+        # Secondary button (Gray)
+        style.configure(
+            "YouTube.secondary.TButton",
+            font=(FONT_FAMILY, FONT_SIZE_NORMAL),
+            foreground=YOUTUBE_DARK,
+            background=YOUTUBE_LIGHT_GRAY,
+        )
+
+
+class VirtualVideoList(ttk.Frame):
+    """Scrollable list of playlist videos that only builds the visible rows
+
+    The canvas scroll region covers every entry, but widgets exist only for
+    the rows on screen. A small pool of row widgets is moved and refilled
+    as the view scrolls, so showing a playlist costs the same whether it has
+    ten entries or ten thousand. Check state is not kept in the widgets:
+    is_checked(index) is asked when a row is filled and on_toggle(index,
+    checked) is called when the user clicks a checkbox.
+
+    Thumbnails of the rows on screen, then of the next screenful, are asked
+    from the prefetcher each time the view changes, and the prefetcher's
+    results are passed back to show_thumbnail() on the Tk thread. Only the
+    ROW_THUMBNAIL_LIMIT most recently shown images are kept.
+    """
+
+    def __init__(
+        self,
+        parent,
+        is_checked,
+        on_toggle,
+        on_range_toggle=None,
+        prefetcher=None,
+        **kwargs,
+    ):
+        super().__init__(parent, style="Content.TFrame", **kwargs)
+        self.is_checked = is_checked
+        self.on_toggle = on_toggle
+        self.on_range_toggle = on_range_toggle
+        self.prefetcher = prefetcher
+        self.entries = []
+        self.thumbnail_urls = []
+        self.rows = []  # Pool of reusable row widgets
+        self.images = OrderedDict()  # Thumbnail URL -> PhotoImage, oldest first
+        self.placeholder = tk.PhotoImage(
+            width=ROW_THUMBNAIL_SIZE[0], height=ROW_THUMBNAIL_SIZE[1]
+        )
+
+        self.canvas = tk.Canvas(self, bg=YOUTUBE_WHITE, highlightthickness=0)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.scrollbar = ttk.Scrollbar(
+            self, orient="vertical", command=self.canvas.yview
+        )
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.canvas.configure(yscrollcommand=self.on_view_changed)
+        self.canvas.bind("<Configure>", lambda e: self.refresh())
+        self.bind_mousewheel(self.canvas)
+
+    def set_entries(self, entries):
+        """Show a new list of entries, scrolled to the top"""
+        self.entries = list(entries)
+        self.thumbnail_urls = [
+            entry_thumbnail_url(entry, ROW_THUMBNAIL_SIZE[0]) for entry in entries
+        ]
+        for row in self.rows:
+            row["index"] = None  # Refill every row, even at the same index
+        self.canvas.configure(
+            scrollregion=(0, 0, 0, len(entries) * VIDEO_ROW_HEIGHT),
+            yscrollincrement=VIDEO_ROW_HEIGHT,
+        )
+        self.canvas.yview_moveto(0)
+        self.refresh()
+
+    def append_entries(self, entries):
+        """Add entries at the end without moving the view"""
+        self.entries.extend(entries)
+        self.thumbnail_urls.extend(
+            entry_thumbnail_url(entry, ROW_THUMBNAIL_SIZE[0]) for entry in entries
+        )
+        self.canvas.configure(
+            scrollregion=(0, 0, 0, len(self.entries) * VIDEO_ROW_HEIGHT)
+        )
+        self.refresh()
+
+    def on_view_changed(self, first, last):
+        self.scrollbar.set(first, last)
+        self.refresh()
+
+    def bind_mousewheel(self, widget):
+        widget.bind("<MouseWheel>", self.on_mousewheel)
+        widget.bind("<Button-4>", self.on_mousewheel)
+        widget.bind("<Button-5>", self.on_mousewheel)
+
+    def on_mousewheel(self, event):
+        if event.num == 4:
+            self.canvas.yview_scroll(-1, "units")
+        elif event.num == 5:
+            self.canvas.yview_scroll(1, "units")
+        else:
+            self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+        return "break"  # Don't let the history tab scroll too
+
+    def create_row(self):
+        """Create one reusable row widget"""
+        frame = ttk.Frame(
+            self.canvas, style="Card.TFrame", padding=5, height=VIDEO_ROW_HEIGHT
+        )
+        frame.pack_propagate(False)
+        row = {"frame": frame, "index": None, "var": tk.BooleanVar(value=False)}
+
+        checkbox = ttk.Checkbutton(
+            frame, variable=row["var"], command=lambda r=row: self.on_row_toggled(r)
+        )
+        checkbox.pack(side=tk.LEFT, padx=(0, 10))
+        checkbox.bind("<Shift-Button-1>", lambda e, r=row: self.on_row_shift_clicked(r))
+
+        row["index_label"] = ttk.Label(frame, style="TLabel")
+        row["index_label"].pack(side=tk.LEFT, padx=(0, 10))
+
+        row["thumbnail_label"] = ttk.Label(frame, image=self.placeholder)
+        row["thumbnail_label"].pack(side=tk.LEFT, padx=(0, 10))
+
+        row["title_label"] = ttk.Label(frame, style="TLabel")
+        row["title_label"].pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        for widget in (
+            frame,
+            checkbox,
+            row["index_label"],
+            row["thumbnail_label"],
+            row["title_label"],
+        ):
+            self.bind_mousewheel(widget)
+
+        row["window"] = self.canvas.create_window(
+            0, 0, window=frame, anchor="nw", width=self.canvas.winfo_width()
+        )
+        self.rows.append(row)
+        return row
+
+    def on_row_toggled(self, row):
+        if row["index"] is not None:
+            self.on_toggle(row["index"], row["var"].get())
+
+    def on_row_shift_clicked(self, row):
+        if row["index"] is None or self.on_range_toggle is None:
+            return None
+        self.on_range_toggle(row["index"])
+        return "break"  # The range handler already updated this checkbox
+
+    def refresh(self):
+        """Move and refill the pooled rows to match the current view"""
+        height = self.canvas.winfo_height()
+        width = self.canvas.winfo_width()
+        first = int(self.canvas.canvasy(0) // VIDEO_ROW_HEIGHT)
+        visible = height // VIDEO_ROW_HEIGHT + 2
+
+        while len(self.rows) < visible:
+            self.create_row()
+
+        for offset, row in enumerate(self.rows):
+            index = first + offset
+            if offset >= visible or index >= len(self.entries):
+                row["index"] = None
+                self.canvas.itemconfigure(row["window"], state="hidden")
+                continue
+
+            if row["index"] != index:
+                video = self.entries[index]
+                row["index"] = index
+                row["index_label"].config(text=f"{index + 1}.")
+                row["title_label"].config(text=video.get("title") or "Unknown Video")
+                row["thumbnail_label"].config(
+                    image=self.get_image(self.thumbnail_urls[index])
+                )
+            row["var"].set(self.is_checked(index))
+            self.canvas.coords(row["window"], 0, index * VIDEO_ROW_HEIGHT)
+            self.canvas.itemconfigure(row["window"], state="normal", width=width)
+
+        self.request_thumbnails(first, visible)
+
+    def get_image(self, url):
+        """Return the loaded thumbnail for url, or the blank placeholder"""
+        image = self.images.get(url)
+        if image is None:
+            return self.placeholder
+        self.images.move_to_end(url)
+        return image
+
+    def request_thumbnails(self, first, visible):
+        """Ask for missing thumbnails on screen first, then the next screenful"""
+        if self.prefetcher is None:
+            return
+        wanted = []
+        for url in self.thumbnail_urls[first : first + 2 * visible]:
+            if url and url not in self.images and url not in wanted:
+                wanted.append(url)
+        self.prefetcher.want(wanted)
+
+    def show_thumbnail(self, url, path):
+        """Load a fetched thumbnail and show it on the rows that use it"""
+        rows = [
+            row
+            for row in self.rows
+            if row["index"] is not None and self.thumbnail_urls[row["index"]] == url
+        ]
+        if not rows and len(self.images) >= ROW_THUMBNAIL_LIMIT:
+            return  # Scrolled away; loading it would only evict a useful one
+        image = load_thumbnail(path)
+        if image is None:
+            return
+        self.images[url] = image
+        while len(self.images) > ROW_THUMBNAIL_LIMIT:
+            self.images.popitem(last=False)
+        for row in rows:
+            row["thumbnail_label"].config(image=image)
+
+
+class PlaylistDownloaderApp:
+    def __init__(self, root):
+        self.root = root
+        self.root.title(APP_TITLE)
+        self.root.geometry(f"{WINDOW_WIDTH}x{WINDOW_HEIGHT}")
+        self.root.minsize(800, 600)
+        self.root.configure(bg=YOUTUBE_WHITE)
+
+        # Download manager
+        # Download threads only publish events; the Tk thread applies them
+        self.status_events = StatusEventQueue()
+        self.download_manager = DownloadManager(self.status_events.publish)
+        self.job_queue = JobQueue(
+            self.download_manager,
+            on_change=lambda: self.status_events.publish({"status": "queue"}),
+        )
+
+        # Current download info
+        self.csv_mode = False  # Track if we're in CSV mode
+        self.csv_videos = []  # Store videos from CSV
+        # (download_id, worker_id) -> (status text, fraction, video index)
+        self.worker_status = {}
+        self.videos_done = {}  # download_id -> (completed, total)
+
+        # Initialize variables
+        self.output_dir = tk.StringVar(value=DEFAULT_OUTPUT_DIR)
+        self.format_var = tk.StringVar(value=FORMAT_OPTIONS[0][0])
+        self.status_var = tk.StringVar(value=DEFAULT_STATUS)
+        self.progress_var = tk.DoubleVar(value=0)
+        self.save_thumbnail_var = tk.BooleanVar(value=False)
+        self.auto_tune_var = tk.BooleanVar(value=False)
+        self.speed_limit_var = tk.StringVar()  # MB/s, empty for no limit
+        self.full_speed_var = tk.BooleanVar(value=False)
+        self.full_speed_from_var = tk.StringVar(value=DEFAULT_FULL_SPEED_WINDOW[0])
+        self.full_speed_to_var = tk.StringVar(value=DEFAULT_FULL_SPEED_WINDOW[1])
+        self.speed_limit_error = None  # Status shown for the rejected limit
+        self.playlist_info = None
+        self.selection = VideoSelection()  # Check state of each playlist entry
+        self.last_toggled_index = None  # Anchor for shift-click range selection
+        # Selection to restore after the preview: video IDs, or the 1-based
+        # playlist_items of history entries from before IDs were kept
+        self.pending_video_ids = None
+        self.pending_playlist_items = None
+        self.restore_ids = None  # Same, for entries still being loaded
+        self.restore_indices = None
+        self.streaming_preview = False  # Entries are arriving batch by batch
+        self.downloading = False  # Any queued job is running
+        self.job_rows = {}  # download_id -> (progress label, state) in the jobs panel
+        self.thumbnails = ThumbnailCache()
+        self.header_thumbnail_url = None  # Thumbnail the playlist header wants
+
+        # Set up styles
+        self.setup_styles()
+
+        # Set up UI
+        self.setup_ui()
+        self.refresh_jobs()
+
+        # Start applying download events at a fixed rate
+        self.process_status_events()
+
+        # Offer to continue downloads interrupted last time
+        self.root.after(RESUME_PROMPT_DELAY_MS, self.offer_resume)
+
+    def setup_styles(self):
+        """Set up ttk styles"""
+        style = ttk.Style()
+
+        # Button styles
+        style.configure("TButton", font=(FONT_FAMILY, FONT_SIZE_NORMAL), padding=6)
+
+        # Primary button style (red with black text)
+        style.configure(
+            "Primary.TButton",
+            foreground=BUTTON_TEXT_COLOR,
+            background=YOUTUBE_RED,
+            font=(FONT_FAMILY, FONT_SIZE_NORMAL, "bold"),
+        )
+        style.map(
+            "Primary.TButton",
+            foreground=[("pressed", BUTTON_TEXT_COLOR), ("active", BUTTON_TEXT_COLOR)],
+            background=[("pressed", "#CC0000"), ("active", "#DD0000")],
+        )
+
+        # Secondary button style (gray with black text)
+        style.configure(
+            "Secondary.TButton",
+            foreground=BUTTON_TEXT_COLOR,
+            background=YOUTUBE_LIGHT_GRAY,
+        )
+        style.map(
+            "Secondary.TButton",
+            foreground=[("pressed", BUTTON_TEXT_COLOR), ("active", BUTTON_TEXT_COLOR)],
+            background=[("pressed", "#E0E0E0"), ("active", "#EBEBEB")],
+        )
+
+        # Danger button style (dark red with black text)
+        style.configure(
+            "Danger.TButton",
+            foreground=BUTTON_TEXT_COLOR,
+            background="#CC0000",
+            font=(FONT_FAMILY, FONT_SIZE_NORMAL, "bold"),
+        )
+        style.map(
+            "Danger.TButton",
+            foreground=[("pressed", BUTTON_TEXT_COLOR), ("active", BUTTON_TEXT_COLOR)],
+            background=[("pressed", "#BB0000"), ("active", "#CC0000")],
+        )
+
+        # Entry style
+        style.configure("TEntry", font=(FONT_FAMILY, FONT_SIZE_NORMAL), padding=8)
+
+        # Label styles - all with black text
+        style.configure(
+            "TLabel",
+            font=(FONT_FAMILY, FONT_SIZE_NORMAL),
+            foreground=YOUTUBE_DARK,
+            background=YOUTUBE_WHITE,
+        )
+
+        # Title label
+        style.configure(
+            "Title.TLabel",
+            font=(FONT_FAMILY, FONT_SIZE_TITLE, "bold"),
+            foreground=YOUTUBE_DARK,
+            background=YOUTUBE_WHITE,
+        )
+
+        # Header label
+        style.configure(
+            "Header.TLabel",
+            font=(FONT_FAMILY, FONT_SIZE_LARGE, "bold"),
+            foreground=YOUTUBE_DARK,
+            background=YOUTUBE_WHITE,
+        )
+
+        # Status label
+        style.configure(
+            "Status.TLabel",
+            font=(FONT_FAMILY, FONT_SIZE_NORMAL),
+            foreground=YOUTUBE_DARK,
+            background=YOUTUBE_WHITE,
+        )
+
+        # Error label
+        style.configure(
+            "Error.TLabel",
+            font=(FONT_FAMILY, FONT_SIZE_NORMAL),
+            foreground=YOUTUBE_DARK,
+            background=YOUTUBE_WHITE,
+        )
+
+        # Frame styles - all with white background, no borders
+        style.configure("TFrame", background=YOUTUBE_WHITE)
+
+        # Header frame
+        style.configure("Header.TFrame", background=YOUTUBE_WHITE)
+
+        # Content frame
+        style.configure("Content.TFrame", background=YOUTUBE_WHITE)
+
+        # Card frame - removed border/relief
+        style.configure(
+            "Card.TFrame", background=YOUTUBE_WHITE, relief="flat", borderwidth=0
+        )
+
+        # Progress bar
+        style.configure("TProgressbar", thickness=8, background=YOUTUBE_RED)
+
+        # Combobox
+        style.configure("TCombobox", font=(FONT_FAMILY, FONT_SIZE_NORMAL), padding=8)
+
+    def setup_ui(self):
+        """Set up the application UI"""
+        # Main container (with padding)
+        self.main_container = ttk.Frame(self.root, style="TFrame", padding=PADDING)
+        self.main_container.pack(fill=tk.BOTH, expand=True)
+
+        # Header
+        header_frame = ttk.Frame(self.main_container, style="Header.TFrame")
+        header_frame.pack(fill=tk.X, pady=(0, 15))
+
+        # App title
+        title_label = ttk.Label(header_frame, text=APP_TITLE, style="Title.TLabel")
+        title_label.pack(anchor=tk.W)
+
+        # Input frame
+        input_frame = ttk.Frame(self.main_container, style="Content.TFrame")
+        input_frame.pack(fill=tk.X, pady=(0, 15))
+
+        # URL input
+        url_label = ttk.Label(input_frame, text=LABEL_PLAYLIST_URL, style="TLabel")
+        url_label.grid(row=0, column=0, sticky=tk.W, pady=(0, 5))
+
+        self.url_entry = ttk.Entry(input_frame, width=50, style="TEntry")
+        self.url_entry.grid(row=1, column=0, sticky="we", padx=(0, 10))
+
+        # URL preview button
+        self.preview_button = ttk.Button(
+            input_frame,
+            text="Get Videos",
+            style="Secondary.TButton",
+            command=self.preview_playlist,
+        )
+        self.preview_button.grid(row=1, column=1, padx=5)
+
+        # CSV buttons frame
+        csv_button_frame = ttk.Frame(input_frame, style="Content.TFrame")
+        csv_button_frame.grid(row=2, column=1, columnspan=2, pady=(10, 0), sticky=tk.W)
+
+        # Open CSV button
+        self.open_csv_button = ttk.Button(
+            csv_button_frame,
+            text="Open CSV",
+            style="Secondary.TButton",
+            command=self.open_csv_file,
+        )
+        self.open_csv_button.pack(side=tk.LEFT, padx=(0, 5))
+
+        # Download from CSV button
+        self.csv_download_button = ttk.Button(
+            csv_button_frame,
+            text="Download from CSV",
+            style="Primary.TButton",
+            command=self.load_csv_playlist,
+        )
+        self.csv_download_button.pack(side=tk.LEFT)
+
+        # Output directory
+        dir_label = ttk.Label(input_frame, text=LABEL_OUTPUT_DIR, style="TLabel")
+        dir_label.grid(row=0, column=2, sticky=tk.W, pady=(0, 5), padx=(20, 0))
+
+        dir_entry = ttk.Entry(
+            input_frame, width=30, textvariable=self.output_dir, style="TEntry"
+        )
+        dir_entry.grid(row=1, column=2, sticky="we", padx=(20, 10))
+
+        # Browse button
+        browse_button = ttk.Button(
+            input_frame,
+            text=BUTTON_BROWSE,
+            style="Secondary.TButton",
+            command=self.browse_directory,
+        )
+        browse_button.grid(row=1, column=3, padx=5)
+
+        # Format selection
+        format_label = ttk.Label(input_frame, text="Format:", style="TLabel")
+        format_label.grid(row=3, column=0, sticky=tk.W, pady=(15, 5))
+
+        format_menu = ttk.Combobox(
+            input_frame,
+            textvariable=self.format_var,
+            values=[f[0] for f in FORMAT_OPTIONS],
+            state="readonly",
+            style="TCombobox",
+        )
+        format_menu.grid(row=4, column=0, sticky="we", padx=(0, 10))
+        format_menu.current(0)
+
+        # Let the download find its fastest number of parallel fragments
+        ttk.Checkbutton(
+            input_frame,
+            text="Auto-tune parallel fragments",
+            variable=self.auto_tune_var,
+        ).grid(row=5, column=0, sticky=tk.W, pady=(5, 0))
+
+        # Bandwidth limit, applied to running downloads as it is edited
+        limit_label = ttk.Label(input_frame, text="Speed limit (MB/s):", style="TLabel")
+        limit_label.grid(row=3, column=2, sticky=tk.W, pady=(15, 5), padx=(20, 0))
+
+        limit_frame = ttk.Frame(input_frame, style="Content.TFrame")
+        limit_frame.grid(row=4, column=2, columnspan=2, sticky=tk.W, padx=(20, 0))
+        ttk.Entry(limit_frame, textvariable=self.speed_limit_var, width=6).pack(
+            side=tk.LEFT
+        )
+        ttk.Checkbutton(
+            limit_frame, text="Full speed from", variable=self.full_speed_var
+        ).pack(side=tk.LEFT, padx=(10, 5))
+        ttk.Entry(limit_frame, textvariable=self.full_speed_from_var, width=6).pack(
+            side=tk.LEFT
+        )
+        ttk.Label(limit_frame, text="to", style="TLabel").pack(side=tk.LEFT, padx=5)
+        ttk.Entry(limit_frame, textvariable=self.full_speed_to_var, width=6).pack(
+            side=tk.LEFT
+        )
+
+        for var in (
+            self.speed_limit_var,
+            self.full_speed_var,
+            self.full_speed_from_var,
+            self.full_speed_to_var,
+        ):
+            var.trace_add("write", self.on_speed_limit_changed)
+
+        # Configure grid
+        input_frame.columnconfigure(0, weight=3)
+        input_frame.columnconfigure(2, weight=2)
+
+        # Create notebook for playlist info and download history
+        self.notebook = ttk.Notebook(self.main_container)
+        self.notebook.pack(fill=tk.BOTH, expand=True, pady=(0, 15))
+
+        # Playlist info tab
+        self.playlist_frame = ttk.Frame(
+            self.notebook, style="Content.TFrame", padding=PADDING
+        )
+        self.notebook.add(self.playlist_frame, text="Playlist Details")
+
+        # Jobs tab
+        self.jobs_frame = ttk.Frame(
+            self.notebook, style="Content.TFrame", padding=PADDING
+        )
+        self.notebook.add(self.jobs_frame, text="Jobs")
+
+        # History tab
+        self.history_frame = ttk.Frame(
+            self.notebook, style="Content.TFrame", padding=PADDING
+        )
+        self.notebook.add(self.history_frame, text="Download History")
+
+        # Setup playlist frame
+        self.setup_playlist_frame()
+
+        # Setup jobs frame
+        self.setup_jobs_frame()
+
+        # Setup history frame
+        self.setup_history_frame()
+
+        # Bottom control frame
+        control_frame = ttk.Frame(self.main_container, style="Content.TFrame")
+        control_frame.pack(fill=tk.X, pady=(0, 10))
+
+        # Status display
+        status_frame = ttk.Frame(control_frame, style="Content.TFrame")
+        status_frame.pack(fill=tk.X, side=tk.TOP, pady=(0, 10))
+
+        status_label = ttk.Label(status_frame, text="Status:", style="TLabel")
+        status_label.pack(side=tk.LEFT)
+
+        self.status_display = ttk.Label(
+            status_frame, textvariable=self.status_var, style="Status.TLabel"
+        )
+        self.status_display.pack(side=tk.LEFT, padx=(5, 0))
+
+        # Progress info
+        self.progress_info = ttk.Label(status_frame, text="", style="Status.TLabel")
+        self.progress_info.pack(side=tk.RIGHT)
+
+        # Progress bar
+        self.progress = ttk.Progressbar(
+            control_frame,
+            orient="horizontal",
+            mode="determinate",
+            variable=self.progress_var,
+            style="TProgressbar",
+        )
+        self.progress.pack(fill=tk.X, pady=(0, 10))
+
+        # Button frame
+        button_frame = ttk.Frame(control_frame, style="Content.TFrame")
+        button_frame.pack(fill=tk.X)
+
+        # Download button
+        self.download_button = ttk.Button(
+            button_frame,
+            text=BUTTON_DOWNLOAD,
+            style="Primary.TButton",
+            command=self.start_download,
+        )
+        self.download_button.pack(side=tk.LEFT, padx=(0, 10))
+
+        # Pause/Resume button
+        self.pause_button = ttk.Button(
+            button_frame,
+            text=BUTTON_PAUSE,
+            style="Secondary.TButton",
+            command=self.toggle_pause,
+            state=tk.DISABLED,
+        )
+        self.pause_button.pack(side=tk.LEFT, padx=(0, 10))
+
+        # Stop button
+        self.stop_button = ttk.Button(
+            button_frame,
+            text=BUTTON_STOP,
+            style="Danger.TButton",
+            command=self.stop_download,
+            state=tk.DISABLED,
+        )
+        self.stop_button.pack(side=tk.LEFT)
+
+    def setup_playlist_frame(self):
+        """Set up the playlist information frame"""
+        # Empty state
+        self.playlist_empty_label = ttk.Label(
+            self.playlist_frame,
+            text="Enter a YouTube playlist URL and click Get Videos to see details",
+            style="Header.TLabel",
+        )
+        self.playlist_empty_label.pack(anchor=tk.CENTER, expand=True)
+
+        # Playlist info container (hidden initially)
+        self.playlist_info_container = ttk.Frame(
+            self.playlist_frame, style="Content.TFrame"
+        )
+
+        # Playlist header
+        playlist_header = ttk.Frame(
+            self.playlist_info_container, style="Content.TFrame"
+        )
+        playlist_header.pack(fill=tk.X, pady=(0, 15))
+
+        # Thumbnail placeholder
+        self.thumbnail_label = ttk.Label(playlist_header, style="TLabel")
+        self.thumbnail_label.pack(side=tk.LEFT, padx=(0, 15))
+
+        # Playlist details
+        playlist_details = ttk.Frame(playlist_header, style="Content.TFrame")
+        playlist_details.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.playlist_title = ttk.Label(
+            playlist_details, text="", style="Header.TLabel"
+        )
+        self.playlist_title.pack(anchor=tk.W)
+
+        self.playlist_channel = ttk.Label(playlist_details, text="", style="TLabel")
+        self.playlist_channel.pack(anchor=tk.W)
+
+        self.playlist_count = ttk.Label(playlist_details, text="", style="TLabel")
+        self.playlist_count.pack(anchor=tk.W)
+
+        # Video selection tools
+        selection_frame = ttk.Frame(
+            self.playlist_info_container, style="Content.TFrame"
+        )
+        selection_frame.pack(fill=tk.X, pady=(0, 10))
+
+        selection_label = ttk.Label(
+            selection_frame, text="Video Selection:", style="TLabel"
+        )
+        selection_label.pack(side=tk.LEFT)
+
+        select_all_btn = ttk.Button(
+            selection_frame,
+            text="Select All",
+            style="Secondary.TButton",
+            command=self.select_all_videos,
+        )
+        select_all_btn.pack(side=tk.LEFT, padx=(10, 5))
+
+        select_none_btn = ttk.Button(
+            selection_frame,
+            text="Deselect All",
+            style="Secondary.TButton",
+            command=self.deselect_all_videos,
+        )
+        select_none_btn.pack(side=tk.LEFT)
+
+        invert_btn = ttk.Button(
+            selection_frame,
+            text="Invert",
+            style="Secondary.TButton",
+            command=self.invert_video_selection,
+        )
+        invert_btn.pack(side=tk.LEFT, padx=(5, 0))
+
+        self.selection_count = ttk.Label(selection_frame, text="", style="TLabel")
+        self.selection_count.pack(side=tk.RIGHT)
+
+        # Videos list; only the visible rows are ever built
+        self.video_list = VirtualVideoList(
+            self.playlist_info_container,
+            is_checked=lambda index: index in self.selection,
+            on_toggle=self.toggle_video_selection,
+            on_range_toggle=self.toggle_video_range,
+            prefetcher=ThumbnailPrefetcher(
+                self.thumbnails,
+                lambda url, path: self.status_events.publish(
+                    {"status": "row_thumbnail", "url": url, "path": path}
+                ),
+                size=ROW_THUMBNAIL_SIZE,
+            ),
+        )
+        self.video_list.pack(fill=tk.BOTH, expand=True)
+
+    def setup_jobs_frame(self):
+        """Set up the panel of queued and running jobs"""
+        header = ttk.Frame(self.jobs_frame, style="Content.TFrame")
+        header.pack(side=tk.TOP, fill=tk.X, pady=(0, 5))
+
+        ttk.Label(header, text="Parallel jobs:", style="TLabel").pack(side=tk.LEFT)
+        self.queue_slots_var = tk.IntVar(value=QUEUE_SLOTS)
+        ttk.Spinbox(
+            header,
+            from_=1,
+            to=MAX_QUEUE_SLOTS,
+            width=3,
+            textvariable=self.queue_slots_var,
+            command=self.on_queue_slots_changed,
+        ).pack(side=tk.LEFT, padx=(5, 0))
+
+        self.jobs_container = ttk.Frame(self.jobs_frame, style="Content.TFrame")
+        self.jobs_container.pack(fill=tk.BOTH, expand=True)
+
+    def on_queue_slots_changed(self):
+        """Let more or fewer queued jobs run at the same time"""
+        try:
+            self.job_queue.set_slots(self.queue_slots_var.get())
+        except tk.TclError:
+            pass  # Not a number (yet)
+
+    def refresh_jobs(self):
+        """Rebuild the jobs panel from the queue"""
+        for child in self.jobs_container.winfo_children():
+            child.destroy()
+        self.job_rows = {}
+
+        jobs = self.job_queue.jobs()
+        if not jobs:
+            ttk.Label(
+                self.jobs_container, text="No queued downloads", style="Header.TLabel"
+            ).pack(anchor=tk.CENTER, expand=True, pady=50)
+        for job in jobs:
+            self.create_job_row(job)
+
+        # The bottom buttons act on every job
+        self.downloading = any(job["state"] == QUEUE_RUNNING for job in jobs)
+        held = jobs and all(job["state"] == QUEUE_PAUSED for job in jobs)
+        self.pause_button.config(
+            state=tk.NORMAL if jobs else tk.DISABLED,
+            text=BUTTON_RESUME if held else BUTTON_PAUSE,
+        )
+        self.stop_button.config(state=tk.NORMAL if jobs else tk.DISABLED)
+
+    def create_job_row(self, job):
+        """Add a job's row with its progress and controls to the jobs panel"""
+        job_id = job["id"]
+        row = ttk.Frame(self.jobs_container, style="Card.TFrame", padding=5)
+        row.pack(fill=tk.X, pady=(0, 5))
+
+        title = job["title"] or "Unknown Playlist"
+        if len(title) > JOB_TITLE_WIDTH:
+            title = title[: JOB_TITLE_WIDTH - 3] + "..."
+        ttk.Label(row, text=title, style="TLabel").pack(side=tk.LEFT)
+
+        progress_label = ttk.Label(row, text="", style="Status.TLabel")
+        progress_label.pack(side=tk.LEFT, padx=(10, 0))
+        self.job_rows[job_id] = (progress_label, job["state"])
+        self.refresh_job_progress(job_id)
+
+        ttk.Button(
+            row,
+            text=BUTTON_STOP,
+            style="Secondary.TButton",
+            command=lambda: self.job_queue.stop(job_id),
+        ).pack(side=tk.RIGHT)
+        paused = job["state"] == QUEUE_PAUSED
+        ttk.Button(
+            row,
+            text=BUTTON_RESUME if paused else BUTTON_PAUSE,
+            style="Secondary.TButton",
+            command=lambda: (
+                self.job_queue.resume(job_id)
+                if paused
+                else self.job_queue.pause(job_id)
+            ),
+        ).pack(side=tk.RIGHT, padx=(0, 5))
+        ttk.Button(
+            row,
+            text="Down",
+            style="Secondary.TButton",
+            command=lambda: self.job_queue.move(job_id, 1),
+        ).pack(side=tk.RIGHT, padx=(0, 5))
+        ttk.Button(
+            row,
+            text="Up",
+            style="Secondary.TButton",
+            command=lambda: self.job_queue.move(job_id, -1),
+        ).pack(side=tk.RIGHT, padx=(0, 5))
+
+        # Weight of the job's share of the speed limit
+        priority_var = tk.IntVar(
+            value=job["params"].get("priority", DEFAULT_JOB_PRIORITY)
+        )
+        ttk.Spinbox(
+            row,
+            from_=1,
+            to=MAX_JOB_PRIORITY,
+            width=3,
+            textvariable=priority_var,
+            command=lambda: self.on_job_priority_changed(job_id, priority_var),
+        ).pack(side=tk.RIGHT, padx=(0, 10))
+        ttk.Label(row, text="Priority:", style="TLabel").pack(side=tk.RIGHT)
+
+    def on_job_priority_changed(self, job_id, priority_var):
+        """Give a job a bigger or smaller share of the speed limit"""
+        try:
+            priority = priority_var.get()
+        except tk.TclError:
+            return  # Not a number (yet)
+        if priority >= 1:
+            self.job_queue.set_priority(job_id, priority)
+
+    def refresh_job_progress(self, download_id):
+        """Show a job's state and how many of its videos are done"""
+        row = self.job_rows.get(download_id)
+        if row is None:
+            return
+        label, state = row
+        completed, total = self.videos_done.get(download_id, (0, 0))
+        text = state.capitalize()
+        if total:
+            text += f" - {completed} of {total} done"
+        label.config(text=text)
+
+    def setup_history_frame(self):
+        """Set up the download history frame"""
+        # Cards already built, by history "_seq", and the ones currently shown.
+        # At most HISTORY_CARD_LIMIT are kept; the shown ones are a window
+        # that pages in at one end and drops cards at the other.
+        self.history_cards = {}
+        self.history_shown = []
+        self.history_cursor = None
+        self.history_exhausted = True
+        self.history_has_newer = False
+        self.history_loading = False
+        self.history_empty_label = None
+        self.history_filter_job = None
+
+        # Filter bar
+        filter_frame = ttk.Frame(self.history_frame, style="Content.TFrame")
+        filter_frame.pack(side=tk.TOP, fill=tk.X, pady=(0, 5))
+
+        ttk.Label(filter_frame, text="Status:", style="TLabel").pack(side=tk.LEFT)
+        self.history_status_var = tk.StringVar(value=HISTORY_ALL_STATUSES)
+        status_combo = ttk.Combobox(
+            filter_frame,
+            textvariable=self.history_status_var,
+            values=HISTORY_STATUS_FILTERS,
+            state="readonly",
+            width=10,
+        )
+        status_combo.pack(side=tk.LEFT, padx=(5, 10))
+
+        ttk.Label(filter_frame, text="URL:", style="TLabel").pack(side=tk.LEFT)
+        self.history_url_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.history_url_var, width=20).pack(
+            side=tk.LEFT, padx=(5, 10)
+        )
+
+        ttk.Label(filter_frame, text="Since (YYYY-MM-DD):", style="TLabel").pack(
+            side=tk.LEFT
+        )
+        self.history_since_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.history_since_var, width=11).pack(
+            side=tk.LEFT, padx=(5, 0)
+        )
+
+        for var in (
+            self.history_status_var,
+            self.history_url_var,
+            self.history_since_var,
+        ):
+            var.trace_add("write", self.on_history_filter_changed)
+
+        # Create a canvas for scrolling
+        self.history_canvas = tk.Canvas(
+            self.history_frame, bg=YOUTUBE_WHITE, highlightthickness=0
+        )
+        self.history_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # Add a scrollbar
+        self.history_scrollbar = ttk.Scrollbar(
+            self.history_frame, orient="vertical", command=self.history_canvas.yview
+        )
+        self.history_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # Configure the canvas; the next page is loaded when the view nears
+        # the bottom
+        self.history_canvas.configure(yscrollcommand=self.on_history_scrolled)
+
+        # Create a frame inside the canvas for history items
+        self.history_container = ttk.Frame(self.history_canvas, style="Content.TFrame")
+        self.history_canvas.create_window(
+            (0, 0),
+            window=self.history_container,
+            anchor="nw",
+            width=self.history_canvas.winfo_width(),
+        )
+        self.history_container.bind(
+            "<Configure>",
+            lambda e: self.history_canvas.configure(
+                scrollregion=self.history_canvas.bbox("all")
+            ),
+        )
+
+        # Handle resizing
+        self.history_canvas.bind("<Configure>", self.on_history_canvas_configure)
+
+        # Mouse wheel scrolling
+        self.history_canvas.bind_all("<MouseWheel>", self.on_history_mousewheel)
+        self.history_canvas.bind_all("<Button-4>", self.on_history_mousewheel)
+        self.history_canvas.bind_all("<Button-5>", self.on_history_mousewheel)
+
+        # Load history
+        self.load_history()
+
+    def history_filters(self):
+        """Return the history filters as keyword arguments for the store"""
+        status = self.history_status_var.get()
+        return {
+            "status": None if status == HISTORY_ALL_STATUSES else status,
+            "url": self.history_url_var.get().strip() or None,
+            "since": self.history_since_var.get().strip() or None,
+        }
+
+    def on_history_filter_changed(self, *args):
+        """Reload history shortly after the user stops typing in a filter"""
+        if self.history_filter_job is not None:
+            self.root.after_cancel(self.history_filter_job)
+        self.history_filter_job = self.root.after(
+            HISTORY_FILTER_DELAY_MS, self.load_history
+        )
+
+    def load_history(self):
+        """Show the first page of history matching the filters
+
+        Cards are hidden rather than destroyed, so entries that are shown
+        again are not rebuilt while they are among the cards kept.
+        """
+        self.history_filter_job = None
+        for seq in self.history_shown:
+            self.history_cards[seq].pack_forget()
+        self.history_shown = []
+        self.set_history_empty(False)
+
+        self.history_cursor = None
+        self.history_exhausted = False
+        self.history_has_newer = False
+        self.history_canvas.yview_moveto(0)
+        self.load_next_history_page()
+        self.set_history_empty(not self.history_shown)
+
+    def load_next_history_page(self):
+        """Append the next page of history below the cards already shown"""
+        if self.history_exhausted:
+            self.history_loading = False
+            return
+        self.history_loading = True
+        try:
+            page = self.download_manager.history.page(
+                limit=HISTORY_PAGE_SIZE,
+                before_seq=self.history_cursor,
+                **self.history_filters(),
+            )
+            for item in page:
+                self.show_history_card(item)
+            if page:
+                self.history_cursor = page[-1]["_seq"]
+            self.history_exhausted = len(page) < HISTORY_PAGE_SIZE
+
+            excess = len(self.history_shown) - HISTORY_CARD_LIMIT
+            if excess > 0:
+                self.keep_history_view(
+                    self.history_shown[excess],
+                    lambda: self.drop_history_cards(self.history_shown[:excess]),
+                )
+                self.history_has_newer = True
+            self.prune_history_cards()
+        finally:
+            self.history_loading = False
+
+    def load_previous_history_page(self):
+        """Bring back the page of history above the first card shown"""
+        if not self.history_has_newer or not self.history_shown:
+            self.history_loading = False
+            return
+        self.history_loading = True
+        try:
+            first = self.history_shown[0]
+            page = self.download_manager.history.page(
+                limit=HISTORY_PAGE_SIZE, after_seq=first, **self.history_filters()
+            )
+
+            def show_page():
+                for item in page:
+                    self.show_history_card(item, before=first)
+
+            self.keep_history_view(first, show_page)
+            self.history_has_newer = len(page) == HISTORY_PAGE_SIZE
+
+            excess = len(self.history_shown) - HISTORY_CARD_LIMIT
+            if excess > 0:
+                self.drop_history_cards(self.history_shown[-excess:])
+                self.history_cursor = self.history_shown[-1]
+                self.history_exhausted = False
+            self.prune_history_cards()
+        finally:
+            self.history_loading = False
+
+    def keep_history_view(self, anchor, change):
+        """Run change() and scroll so the anchor card stays where it was"""
+        card = self.history_cards[anchor]
+        self.history_canvas.update_idletasks()
+        y = card.winfo_y()
+        change()
+        self.history_canvas.update_idletasks()
+        shift = card.winfo_y() - y
+        if not shift:
+            return
+        top = self.history_canvas.canvasy(0) + shift
+        self.history_canvas.configure(scrollregion=self.history_canvas.bbox("all"))
+        height = self.history_canvas.bbox("all")[3]
+        self.history_canvas.yview_moveto(top / height if height else 0)
+
+    def drop_history_cards(self, seqs):
+        """Destroy the cards of entries scrolled far out of view"""
+        for seq in seqs:
+            self.history_shown.remove(seq)
+            self.history_cards.pop(seq).destroy()
+
+    def prune_history_cards(self):
+        """Destroy hidden cards, oldest built first, beyond HISTORY_CARD_LIMIT"""
+        excess = len(self.history_cards) - HISTORY_CARD_LIMIT
+        if excess <= 0:
+            return
+        shown = set(self.history_shown)
+        hidden = [seq for seq in self.history_cards if seq not in shown]
+        for seq in hidden[:excess]:
+            self.history_cards.pop(seq).destroy()
+
+    def on_history_scrolled(self, first, last):
+        """Update the scrollbar and page in more history near either end"""
+        self.history_scrollbar.set(first, last)
+        if self.history_loading:
+            return
+        if float(last) > HISTORY_PREFETCH_FRACTION and not self.history_exhausted:
+            self.history_loading = True
+            self.root.after_idle(self.load_next_history_page)
+        elif float(first) < 1 - HISTORY_PREFETCH_FRACTION and self.history_has_newer:
+            self.history_loading = True
+            self.root.after_idle(self.load_previous_history_page)
+
+    def show_history_card(self, item, before=None):
+        """Pack the card for a history entry, building it only if needed"""
+        seq = item["_seq"]
+        card = self.history_cards.get(seq)
+        if card is None:
+            card = self.history_cards[seq] = self.create_history_item(item)
+        if before is None:
+            card.pack(fill=tk.X, pady=(0, 10))
+            self.history_shown.append(seq)
+        else:
+            card.pack(fill=tk.X, pady=(0, 10), before=self.history_cards[before])
+            self.history_shown.insert(self.history_shown.index(before), seq)
+
+    def set_history_empty(self, empty):
+        """Show or hide the "No download history" message"""
+        if empty and self.history_empty_label is None:
+            self.history_empty_label = ttk.Label(
+                self.history_container,
+                text="No download history yet",
+                style="Header.TLabel",
+            )
+            self.history_empty_label.pack(anchor=tk.CENTER, expand=True, pady=50)
+        elif not empty and self.history_empty_label is not None:
+            self.history_empty_label.destroy()
+            self.history_empty_label = None
+
+    def refresh_history_entry(self, download_id):
+        """Rebuild only the card of one download after it started or changed"""
+        item = self.download_manager.history.get(download_id)
+        if item is None:
+            return
+        seq = item["_seq"]
+
+        # Entries are shown newest first; one outside the loaded window is
+        # left for paging to bring in
+        shown = self.history_shown
+        outside = (
+            shown
+            and seq not in shown
+            and (
+                (self.history_has_newer and seq > shown[0])
+                or (not self.history_exhausted and seq < shown[-1])
+            )
+        )
+
+        old_card = self.history_cards.pop(seq, None)
+        if seq in shown:
+            shown.remove(seq)
+        if old_card is not None:
+            old_card.destroy()
+        if outside:
+            return
+
+        before = next((s for s in shown if s < seq), None)
+        if self.download_manager.history.matches(item, **self.history_filters()):
+            self.set_history_empty(False)
+            self.show_history_card(item, before=before)
+            if len(self.history_shown) > HISTORY_CARD_LIMIT:
+                self.drop_history_cards(self.history_shown[-1:])
+                self.history_cursor = self.history_shown[-1]
+                self.history_exhausted = False
+        else:
+            self.set_history_empty(not self.history_shown)
+
+    def create_history_item(self, item):
+        """Create a history item card, left for the caller to pack"""
+        item_frame = ttk.Frame(self.history_container, style="Card.TFrame", padding=10)
+
+        # Title and date
+        title_frame = ttk.Frame(item_frame, style="Content.TFrame")
+        title_frame.pack(fill=tk.X)
+
+        title = item.get("title", "Unknown Playlist")
+        title_label = ttk.Label(title_frame, text=title, style="Header.TLabel")
+        title_label.pack(side=tk.LEFT)
+
+        date = item.get("date", "Unknown date")
+        date_label = ttk.Label(title_frame, text=date, style="Status.TLabel")
+        date_label.pack(side=tk.RIGHT)
+
+        # Details
+        details_frame = ttk.Frame(item_frame, style="Content.TFrame")
+        details_frame.pack(fill=tk.X, pady=(5, 0))
+
+        # URL
+        url_label = ttk.Label(
+            details_frame, text=f"URL: {item.get('url', 'Unknown')}", style="TLabel"
+        )
+        url_label.pack(anchor=tk.W)
+
+        # Format
+        format_label = ttk.Label(
+            details_frame,
+            text=f"Format: {item.get('format', 'Unknown')}",
+            style="TLabel",
+        )
+        format_label.pack(anchor=tk.W)
+
+        # Status with appropriate color
+        status = item.get("status", "unknown")
+        status_style = "Status.TLabel"
+        if status == "completed":
+            status_text = "Status: Completed"
+        elif status == "incomplete":
+            status_text = f"Status: Finished, {item.get('failed', 0)} video(s) failed"
+            status_style = "Error.TLabel"
+        elif status == "error":
+            status_text = f"Status: Error - {item.get('error', 'Unknown error')}"
+            status_style = "Error.TLabel"
+        elif status == "stopped":
+            status_text = "Status: Stopped by user"
+        else:
+            status_text = f"Status: {status.capitalize()}"
+
+        status_label = ttk.Label(details_frame, text=status_text, style=status_style)
+        status_label.pack(anchor=tk.W)
+
+        # Directory
+        dir_label = ttk.Label(
+            details_frame,
+            text=f"Saved to: {item.get('output_dir', 'Unknown')}",
+            style="TLabel",
+        )
+        dir_label.pack(anchor=tk.W)
+
+        # Video count
+        count_label = ttk.Label(
+            details_frame, text=f"Videos: {item.get('videos_count', 0)}", style="TLabel"
+        )
+        count_label.pack(anchor=tk.W)
+
+        # How the files were converted
+        conversions = item.get("conversions")
+        if conversions:
+            conversion_text = f"Conversion: {format_conversions(conversions)}"
+            if item.get("tracks_per_second"):
+                conversion_text += f", {item['tracks_per_second']} tracks/sec"
+            conversion_label = ttk.Label(
+                details_frame, text=conversion_text, style="TLabel"
+            )
+            conversion_label.pack(anchor=tk.W)
+
+        # Action buttons
+        button_frame = ttk.Frame(item_frame, style="Content.TFrame")
+        button_frame.pack(fill=tk.X, pady=(10, 0))
+
+        # Download again button
+        redownload_button = ttk.Button(
+            button_frame,
+            text="Download Again",
+            style="Primary.TButton",
+            command=lambda i=item: self.redownload_item(i),
+        )
+        redownload_button.pack(side=tk.LEFT, padx=(0, 5))
+
+        # Open folder button
+        open_folder_button = ttk.Button(
+            button_frame,
+            text="Open Folder",
+            style="Secondary.TButton",
+            command=lambda d=item.get("output_dir"): self.open_folder(d),
+        )
+        open_folder_button.pack(side=tk.LEFT)
+
+        return item_frame
+
+    def redownload_item(self, item):
+        """Redownload a playlist from history"""
+        self.url_entry.delete(0, tk.END)
+        self.url_entry.insert(0, item.get("url", ""))
+
+        # Set format
+        format_str = item.get("format", FORMAT_OPTIONS[0][0])
+        self.format_var.set(format_str)
+
+        # Set output directory
+        self.output_dir.set(item.get("output_dir", DEFAULT_OUTPUT_DIR))
+
+        # Preview the playlist, restoring the videos picked last time
+        self.preview_playlist()
+        video_ids = item.get("video_ids")
+        self.pending_video_ids = None if video_ids is None else set(video_ids)
+        self.pending_playlist_items = (
+            None if "video_ids" in item else item.get("playlist_items")
+        )
+
+        # Switch to playlist tab
+        self.notebook.select(0)
+
+    def open_folder(self, directory):
+        """Open the output directory in file explorer"""
+        if os.path.exists(directory):
+            if sys.platform == "win32":
+                os.startfile(directory)
+            elif sys.platform == "darwin":  # macOS
+                os.system(f"open '{directory}'")
+            else:  # Linux
+                os.system(f"xdg-open '{directory}'")
+        else:
+            messagebox.showerror("Error", "Directory does not exist")
+
+    def on_history_canvas_configure(self, event):
+        """Handle history canvas resize event"""
+        self.history_canvas.itemconfig(
+            self.history_canvas.find_withtag("all")[0], width=event.width
+        )
+
+    def on_mousewheel(self, event):
+        """This is kept for compatibility but no longer used directly"""
+        # We now use bind_mousewheel_to_canvas() instead
+        pass
+
+    def open_csv_file(self):
+        """Open the CSV file for editing"""
+        open_csv_file()
+
+    def load_csv_playlist(self):
+        """Load videos from CSV file and display them"""
+        # Read CSV file
+        csv_videos = read_csv_playlist()
+
+        if csv_videos is None:
+            messagebox.showerror("Error", f"Could not read CSV file: {CSV_FILE_NAME}")
+            return
+
+        if not csv_videos:
+            messagebox.showwarning("Warning", f"No videos found in {CSV_FILE_NAME}")
+            return
+
+        # Set CSV mode
+        self.csv_mode = True
+        self.csv_videos = csv_videos
+
+        # Create a fake playlist info structure for display
+        self.playlist_info = {
+            "title": f"CSV Playlist ({len(csv_videos)} videos)",
+            "uploader": "From CSV File",
+            "entries": [
+                {"id": str(i), "title": video["title"], "url": video["url"]}
+                for i, video in enumerate(csv_videos)
+            ],
+        }
+
+        # Display the playlist
+        self.display_playlist_info(self.playlist_info)
+        self.status_var.set(f"Loaded {len(csv_videos)} videos from CSV")
+
+        # Switch to playlist tab
+        self.notebook.select(0)
+
+    def on_history_mousewheel(self, event):
+        """Handle mousewheel event for history scrolling"""
+        if event.num == 4 or event.delta > 0:
+            self.history_canvas.yview_scroll(-1, "units")
+        elif event.num == 5 or event.delta < 0:
+            self.history_canvas.yview_scroll(1, "units")
+
+    def preview_playlist(self):
+        """Preview playlist information"""
+        playlist_url = self.url_entry.get().strip()
+        if not playlist_url:
+            messagebox.showerror("Error", "Please enter a YouTube playlist URL")
+            return
+
+        # Normalize URL to handle both youtu.be and youtube.com formats
+        playlist_url = normalize_youtube_url(playlist_url)
+
+        # Update the entry with normalized URL
+        self.url_entry.delete(0, tk.END)
+        self.url_entry.insert(0, playlist_url)
+
+        # Reset CSV mode when previewing URL
+        self.csv_mode = False
+        self.csv_videos = []
+
+        # Update status
+        self.status_var.set(STATUS_PREVIEWING)
+        self.progress_var.set(0)
+        self.progress_info.config(text="")
+
+        # Disable UI during preview
+        self.url_entry.config(state=tk.DISABLED)
+        self.preview_button.config(state=tk.DISABLED)
+        self.download_button.config(state=tk.DISABLED)
+
+        # Start preview in a separate thread; entries are shown as they arrive
+        self.streaming_preview = False
+        preview_thread = Thread(
+            target=self.download_manager.get_playlist_info,
+            args=(
+                playlist_url,
+                lambda info, error: self.status_events.publish(
+                    {"status": "playlist_info", "info": info, "error": error}
+                ),
+            ),
+            kwargs={
+                "on_entries": lambda header, entries: self.status_events.publish(
+                    {"status": "playlist_entries", "info": header, "entries": entries}
+                )
+            },
+        )
+        preview_thread.daemon = True
+        preview_thread.start()
+
+    def handle_playlist_info(self, info, error):
+        """Handle playlist information result"""
+        streamed = self.streaming_preview
+        self.streaming_preview = False
+
+        # Re-enable UI
+        self.url_entry.config(state=tk.NORMAL)
+        self.preview_button.config(state=tk.NORMAL)
+        self.download_button.config(state=tk.NORMAL)
+
+        if error:
+            self.pending_video_ids = None
+            self.pending_playlist_items = None
+            self.restore_ids = None
+            self.restore_indices = None
+            if streamed:
+                count = len(self.playlist_info["entries"])
+                self.playlist_count.config(text=f"Videos: {count}")
+            self.status_var.set(STATUS_ERROR.format(error))
+            messagebox.showerror("Error", f"Could not load playlist: {error}")
+            return
+
+        if info:
+            count = len(info.get("entries") or [])
+            if streamed and count == len(self.playlist_info["entries"]):
+                # Every entry is already on screen
+                self.playlist_info = info
+                self.playlist_count.config(text=f"Videos: {count}")
+            else:
+                self.playlist_info = info
+                self.display_playlist_info(info)
+                self.notebook.select(0)
+            self.restore_ids = None
+            self.restore_indices = None
+            if not self.downloading:
+                self.status_var.set(STATUS_READY)
+        else:
+            self.status_var.set(
+                STATUS_ERROR.format("Could not load playlist information")
+            )
+
+    def handle_playlist_entries(self, header, entries):
+        """Show a batch of entries while the rest of the playlist loads"""
+        if not self.streaming_preview:
+            self.streaming_preview = True
+            self.playlist_info = dict(header, entries=list(entries))
+            self.display_playlist_info(self.playlist_info)
+            self.notebook.select(0)
+
+            # The entries known so far can be downloaded already
+            self.download_button.config(state=tk.NORMAL)
+        else:
+            start = len(self.playlist_info["entries"])
+            self.playlist_info["entries"].extend(entries)
+            restoring = self.restore_ids is not None or self.restore_indices
+            self.selection.extend(len(entries), selected=not restoring)
+            if restoring:
+                for index, entry in enumerate(entries, start):
+                    if self.is_restored(index, entry):
+                        self.selection.set(index, True)
+            self.video_list.append_entries(entries)
+            self.update_selection_count()
+
+        count = len(self.playlist_info["entries"])
+        self.playlist_count.config(text=f"Videos: {count} (loading...)")
+
+    def load_header_thumbnail(self, url):
+        """Show the playlist thumbnail without blocking the UI"""
+        path = self.thumbnails.get(url)
+        if path is not None:
+            self.show_header_thumbnail(url, path)
+            return
+
+        def fetch():
+            path = self.thumbnails.fetch(url)
+            if path is not None:
+                self.status_events.publish(
+                    {"status": "thumbnail", "url": url, "path": path}
+                )
+
+        Thread(target=fetch, daemon=True).start()
+
+    def show_header_thumbnail(self, url, path):
+        """Display a cached thumbnail if the playlist still wants it"""
+        if url != self.header_thumbnail_url:
+            return  # Another playlist was previewed in the meantime
+        thumbnail = load_thumbnail(path)
+        if thumbnail:
+            self.thumbnail_label.config(image=thumbnail)
+            # Keep a reference to prevent garbage collection
+            self.thumbnail_label._image_ref = thumbnail  # type: ignore
+
+    def display_playlist_info(self, info):
+        """Display playlist information"""
+        # Hide empty state and show playlist info
+        self.playlist_empty_label.pack_forget()
+        self.playlist_info_container.pack(fill=tk.BOTH, expand=True)
+
+        # Set playlist details
+        title = info.get("title", "Unknown Playlist")
+        self.playlist_title.config(text=title)
+
+        channel = info.get("uploader", "Unknown Channel")
+        self.playlist_channel.config(text=f"Channel: {channel}")
+
+        entries = info.get("entries", [])
+        count = len(entries)
+        self.playlist_count.config(text=f"Videos: {count}")
+
+        # Show the thumbnail from the cache, or fetch it in the background
+        self.thumbnail_label.config(image="")
+        self.thumbnail_label._image_ref = None  # type: ignore
+        self.header_thumbnail_url = info.get("thumbnail")
+        if self.header_thumbnail_url:
+            self.load_header_thumbnail(self.header_thumbnail_url)
+
+        # Show the videos, all selected by default
+        self.restore_ids = self.pending_video_ids
+        self.restore_indices = (
+            set(parse_playlist_items(self.pending_playlist_items))
+            if self.pending_playlist_items
+            else None
+        )
+        if self.restore_ids is not None or self.restore_indices:
+            self.selection = VideoSelection.from_indices(
+                count,
+                (i for i, entry in enumerate(entries) if self.is_restored(i, entry)),
+            )
+        else:
+            self.selection = VideoSelection(count, selected=True)
+        self.pending_video_ids = None
+        self.pending_playlist_items = None
+        self.last_toggled_index = None
+        self.update_selection_count()
+        self.video_list.set_entries(entries)
+
+    def is_restored(self, index, entry):
+        """Whether a video was picked in the download being done again"""
+        if self.restore_ids is not None:
+            return bool(entry) and entry.get("id") in self.restore_ids
+        return index in self.restore_indices
+
+    @property
+    def selected_videos(self):
+        """Snapshot of the checked videos, safe to hand to a download thread"""
+        return self.selection.copy()
+
+    def selected_video_ids(self):
+        """IDs of the checked videos, or None when the whole playlist is
+
+        A queued job finds its videos by ID, as positions shift when the
+        playlist changes before it starts.
+        """
+        entries = self.playlist_info.get("entries") or []
+        selection = self.selected_videos
+        if len(selection) == len(entries) and not self.streaming_preview:
+            return None
+        return [entries[i].get("id") for i in selection if entries[i]]
+
+    def toggle_video_selection(self, index, selected):
+        """Toggle a video's selection state"""
+        self.selection.set(index, selected)
+        self.last_toggled_index = index
+        self.update_selection_count()
+
+    def toggle_video_range(self, index):
+        """Shift-click: give every video since the last click the new state"""
+        selected = index not in self.selection
+        anchor = self.last_toggled_index
+        if anchor is None:
+            anchor = index
+        self.selection.select_range(
+            min(anchor, index), max(anchor, index) + 1, selected
+        )
+        self.last_toggled_index = index
+        self.update_selection_count()
+        self.video_list.refresh()
+
+    def select_all_videos(self):
+        """Select all videos in the playlist"""
+        self.selection.select_all()
+        self.update_selection_count()
+        self.video_list.refresh()
+
+    def deselect_all_videos(self):
+        """Deselect all videos in the playlist"""
+        self.selection.clear()
+        self.update_selection_count()
+        self.video_list.refresh()
+
+    def invert_video_selection(self):
+        """Select the unselected videos and deselect the selected ones"""
+        self.selection.invert()
+        self.update_selection_count()
+        self.video_list.refresh()
+
+    def update_selection_count(self):
+        self.selection_count.config(
+            text=f"{len(self.selection)} of {self.selection.size} selected"
+        )
+
+    def on_speed_limit_changed(self, *args):
+        """Apply the speed limit fields; invalid input is shown in the status bar"""
+        try:
+            limit = self.speed_limit_var.get().strip()
+            # A bare number is in MB/s, as the label says
+            if limit and (limit[-1].isdigit() or limit[-1] == "."):
+                limit += "M"
+            rate = parse_rate(limit)
+            windows = []
+            if self.full_speed_var.get():
+                window = parse_time_window(
+                    f"{self.full_speed_from_var.get()}-{self.full_speed_to_var.get()}"
+                )
+                windows.append((*window, None))
+        except ValueError as e:
+            self.speed_limit_error = STATUS_ERROR.format(e)
+            self.status_var.set(self.speed_limit_error)
+            return
+        if self.speed_limit_error and self.status_var.get() == self.speed_limit_error:
+            self.status_var.set(DEFAULT_STATUS)
+        self.speed_limit_error = None
+        self.download_manager.limiter.configure(rate, windows)
+
+    def browse_directory(self):
+        """Open directory browser dialog"""
+        directory = filedialog.askdirectory(initialdir=self.output_dir.get())
+        if directory:
+            self.output_dir.set(directory)
+
+    def start_download(self):
+        """Add the playlist or the CSV videos to the download queue"""
+        output_dir = self.output_dir.get()
+        format_option = next(
+            (f[1] for f in FORMAT_OPTIONS if f[0] == self.format_var.get()),
+            FORMAT_OPTIONS[0][1],
+        )
+        save_thumbnail = self.save_thumbnail_var.get()
+        auto_tune = self.auto_tune_var.get()
+
+        # Check if we're in CSV mode
+        if self.csv_mode:
+            # Download from CSV
+            if not self.csv_videos:
+                messagebox.showerror("Error", "No videos loaded from CSV")
+                return
+
+            if not self.selected_videos:
+                messagebox.showerror(
+                    "Error", "Please select at least one video to download"
+                )
+                return
+
+            kind = "csv"
+            title = f"{CSV_FILE_NAME} ({len(self.selected_videos)} videos)"
+            params = {
+                "csv_videos": self.csv_videos,
+                "selected_indices": list(self.selected_videos),
+            }
+        else:
+            # Download from URL
+            playlist_url = self.url_entry.get().strip()
+
+            if not playlist_url:
+                messagebox.showerror("Error", "Please enter a YouTube playlist URL")
+                return
+
+            if not self.playlist_info:
+                # Try to preview first
+                self.preview_playlist()
+                return
+
+            if not self.selected_videos:
+                messagebox.showerror(
+                    "Error", "Please select at least one video to download"
+                )
+                return
+
+            kind = "playlist"
+            title = self.playlist_info.get("title", "Unknown Playlist")
+            params = {
+                "playlist_url": playlist_url,
+                "selected_ids": self.selected_video_ids(),
+            }
+
+        # Create output directory if it doesn't exist
+        if not os.path.exists(output_dir):
+            os.makedirs(output_dir, exist_ok=True)
+
+        # Queue the job; it starts as soon as a slot is free
+        params.update(
+            output_dir=output_dir,
+            format_option=format_option,
+            save_thumbnail=save_thumbnail,
+            auto_tune=auto_tune,
+        )
+        self.job_queue.add(kind, title, params)
+        self.status_var.set(f"Queued: {title}")
+
+    def process_status_events(self):
+        """Apply queued download events on the Tk thread, then reschedule"""
+        try:
+            for status_info in self.status_events.drain():
+                self.update_status(status_info)
+        finally:
+            self.root.after(UI_REFRESH_MS, self.process_status_events)
+
+    def update_status(self, status_info):
+        """Update status information from download manager"""
+        if isinstance(status_info, str):
+            self.status_var.set(status_info)
+            return
+
+        if isinstance(status_info, dict):
+            status = status_info.get("status", "")
+            if status == "playlist_info":
+                self.handle_playlist_info(
+                    status_info.get("info"), status_info.get("error")
+                )
+                return
+            if status == "playlist_entries":
+                self.handle_playlist_entries(
+                    status_info["info"], status_info["entries"]
+                )
+                return
+            if status == "thumbnail":
+                self.show_header_thumbnail(status_info["url"], status_info["path"])
+                return
+            if status == "row_thumbnail":
+                self.video_list.show_thumbnail(status_info["url"], status_info["path"])
+                return
+            if status == "queue":
+                self.refresh_jobs()
+                return
+
+            download_id = status_info.get("download_id")
+            worker_id = status_info.get("worker_id")
+            worker_key = (download_id, worker_id)
+            if "videos_total" in status_info:
+                self.videos_done[download_id] = (
+                    status_info.get("videos_completed", 0),
+                    status_info.get("videos_total", 0),
+                )
+                self.refresh_job_progress(download_id)
+
+            if status == STATUS_DOWNLOADING:
+                # A new job has its "started" history entry now
+                self.status_var.set(STATUS_DOWNLOADING)
+                self.refresh_history_entry(download_id)
+
+            elif status == "downloading":
+                # Update progress bar
+                progress = status_info.get("progress", 0)
+
+                # Format the raw numbers from the progress hook
+                filename = os.path.basename(status_info.get("filename") or "Unknown")
+                percent = f"{progress * 100:.1f}%"
+                speed = status_info.get("speed")
+                speed = format_size(speed) + "/s" if speed else "Unknown"
+                eta = status_info.get("eta")
+                eta = format_time(eta) if eta else "Unknown"
+
+                # Update status text
+
+                status_text = f"Downloading {filename}"
+                self.status_var.set(status_text)
+
+                # Update progress info
+                playlist_index = status_info.get("playlist_index", 0)
+                playlist_count = status_info.get("playlist_count", 0)
+
+                if worker_id is None:
+                    self.progress_var.set(progress * 100)
+                    progress_text = f"Video {playlist_index}/{playlist_count} | {percent} | {speed} | ETA: {eta}"
+                    self.progress_info.config(text=progress_text)
+                else:
+                    self.worker_status[worker_key] = (
+                        f"#{playlist_index} {percent} {speed}",
+                        progress,
+                        playlist_index,
+                    )
+                    self.refresh_worker_progress()
+
+            elif status == "processing":
+                filename = os.path.basename(status_info.get("filename") or "Unknown")
+                playlist_index = status_info.get("playlist_index", 0)
+                playlist_count = status_info.get("playlist_count", 0)
+
+                self.status_var.set(f"Processing {filename}")
+                if worker_id is None:
+                    self.progress_info.config(
+                        text=f"Video {playlist_index}/{playlist_count} | Converting video..."
+                    )
+                else:
+                    self.worker_status[worker_key] = (
+                        f"#{playlist_index} converting",
+                        1.0,
+                        playlist_index,
+                    )
+                    self.refresh_worker_progress()
+
+            elif status == "video_done":
+                # The worker may have moved on while the video was converted
+                current = self.worker_status.get(worker_key)
+                if current and current[2] == status_info.get("playlist_index"):
+                    del self.worker_status[worker_key]
+                self.refresh_worker_progress()
+
+            elif status == STATUS_PAUSED:
+                self.status_var.set(STATUS_PAUSED)
+
+            elif status == STATUS_STOPPED:
+                self.status_var.set(STATUS_STOPPED)
+                self.download_completed(download_id)
+
+            elif status == STATUS_COMPLETE:
+                self.status_var.set(STATUS_COMPLETE)
+                self.progress_var.set(100)
+                progress_text = "All videos downloaded successfully"
+                if status_info.get("tracks_per_second"):
+                    progress_text += (
+                        f" ({status_info['tracks_per_second']} tracks/sec converted)"
+                    )
+                self.progress_info.config(text=progress_text)
+                self.download_completed(download_id)
+
+            elif status.startswith(STATUS_INCOMPLETE.split("{")[0]):
+                self.status_var.set(status)
+                self.progress_info.config(
+                    text=f"{status_info.get('failed', 0)} video(s) could not be "
+                    "downloaded or converted; see the History tab"
+                )
+                self.download_completed(download_id)
+
+            elif status.startswith(STATUS_ERROR.format("")):
+                self.status_var.set(status)
+                self.download_completed(download_id)
+
+    def refresh_worker_progress(self):
+        """Show overall "k of N done" progress plus each worker's status"""
+        completed = sum(done for done, _ in self.videos_done.values())
+        total = sum(total for _, total in self.videos_done.values())
+        if total:
+            in_flight = sum(fraction for _, fraction, _ in self.worker_status.values())
+            self.progress_var.set(min(completed + in_flight, total) / total * 100)
+
+        parts = [f"{completed} of {total} done"]
+        for key in sorted(self.worker_status, key=str):
+            parts.append(f"W{key[1]}: {self.worker_status[key][0]}")
+        self.progress_info.config(text=" | ".join(parts))
+
+    def download_completed(self, download_id):
+        """Handle a finished job (success, error, or stopped)"""
+        # Show the final state of this download in the history tab
+        if download_id is not None:
+            self.refresh_history_entry(download_id)
+
+        # Forget the job's progress; the queue starts the next one
+        self.videos_done.pop(download_id, None)
+        for key in [key for key in self.worker_status if key[0] == download_id]:
+            del self.worker_status[key]
+        if self.videos_done:
+            self.refresh_worker_progress()
+
+    def offer_resume(self):
+        """Offer to continue the downloads that did not finish last time
+
+        Jobs that were queued or running come back paused in the jobs
+        panel; unfinished jobs from the command line are added to them.
+        """
+        for job_id in reversed(self.download_manager.manifest.unfinished()):
+            if job_id not in self.job_queue:
+                title = (self.download_manager.history.get(job_id) or {}).get(
+                    "title", "Unknown Playlist"
+                )
+                self.job_queue.adopt(job_id, title)
+        jobs = self.job_queue.jobs()
+        if not jobs:
+            return
+
+        titles = [job["title"] or "Unknown Playlist" for job in jobs]
+        answer = messagebox.askyesnocancel(
+            "Resume Downloads",
+            f"{len(jobs)} download(s) did not finish last time:\n\n"
+            + "\n".join(titles[:5])
+            + ("\n..." if len(titles) > 5 else "")
+            + "\n\nResume them now? Choose No to discard them, or Cancel to "
+            "decide later in the Jobs tab.",
+        )
+        if answer is None:
+            return
+        for job in jobs:
+            if answer:
+                self.job_queue.resume(job["id"])
+            else:
+                self.job_queue.stop(job["id"])
+                self.refresh_history_entry(job["id"])
+
+    def toggle_pause(self):
+        """Pause every queued job, or resume them all when all are paused"""
+        jobs = self.job_queue.jobs()
+        if jobs and all(job["state"] == QUEUE_PAUSED for job in jobs):
+            for job in jobs:
+                self.job_queue.resume(job["id"])
+        else:
+            for job in jobs:
+                self.job_queue.pause(job["id"])
+
+    def stop_download(self):
+        """Stop every queued job"""
+        jobs = self.job_queue.jobs()
+        if not jobs:
+            return
+
+        # Confirm with user
+        result = messagebox.askyesno(
+            "Confirm Stop", "Are you sure you want to stop all downloads?"
+        )
+        if result:
+            for job in jobs:
+                self.job_queue.stop(job["id"])
+            self.status_var.set(STATUS_STOPPED)
+
+
+def warm_up_yt_dlp():
+    """Import yt-dlp on a background thread"""
+
+    Thread(target=importlib.import_module, args=("yt_dlp",), daemon=True).start()
+
+
+def run_gui():
+    """Create the main window and run the Tk event loop"""
+    root = tk.Tk()
+
+    try:
+        # Determine base path (handles both script & bundled exe)
+        if getattr(sys, "frozen", False):
+            base_path = getattr(
+                sys, "_MEIPASS", os.path.abspath(".")
+            )  # Running as bundled app (exe)
+        else:
+            base_path = os.path.abspath(".")  # Running as script
+
+        icon_ico_path = os.path.join(base_path, "docs/images/icon.ico")
+        icon_png_path = os.path.join(base_path, "docs/images/icon.png")
+
+        # Set Windows taskbar & window icon (.ico)
+        if os.name == "nt" and os.path.exists(icon_ico_path):
+            root.iconbitmap(icon_ico_path)
+
+        # Set cross-platform window icon (.png); Tk reads PNG itself,
+        # so Pillow is not loaded before the first thumbnail
+        if os.path.exists(icon_png_path):
+            icon_photo = tk.PhotoImage(file=icon_png_path)
+            root.iconphoto(True, icon_photo)  # type: ignore
+
+    except Exception as e:
+        print(f"Could not set application icon: {e}")
+
+    # The window's callbacks keep the app alive
+    PlaylistDownloaderApp(root)
+
+    # Load yt-dlp in the background once the window has been drawn, so the
+    # first preview does not pay for the import
+    root.after(YT_DLP_WARMUP_DELAY_MS, warm_up_yt_dlp)
+    root.mainloop()
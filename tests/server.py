@@ -0,0 +1,58 @@
+"""A local HTTP server for the tests, serving random "videos" by name"""
+
+import functools
+import http.server
+import os
+import shutil
+import sys
+import tempfile
+import time
+from threading import Thread
+
+CHUNK_SIZE = 8 * 1024
+
+
+class _Handler(http.server.SimpleHTTPRequestHandler):
+    chunk_delay = 0.0
+
+    def copyfile(self, source, outputfile):
+        # Trickle the body out, so a transfer can be paused halfway
+        while True:
+            chunk = source.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            time.sleep(self.chunk_delay)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(http.server.ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # yt-dlp drops the connection once it has sniffed a file's type
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class VideoServer:
+    """Serves files of the given sizes, sending a chunk every chunk_delay s"""
+
+    def __init__(self, videos, chunk_delay=0.0):
+        self.directory = tempfile.mkdtemp(prefix="test_served_")
+        for name, size in videos.items():
+            with open(os.path.join(self.directory, name), "wb") as f:
+                f.write(os.urandom(size))
+        handler = type("Handler", (_Handler,), {"chunk_delay": chunk_delay})
+        self._server = _Server(
+            ("127.0.0.1", 0), functools.partial(handler, directory=self.directory)
+        )
+        Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def url(self, name):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/{name}"
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+        shutil.rmtree(self.directory)
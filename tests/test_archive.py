@@ -0,0 +1,68 @@
+"""DownloadArchive matching files already in the output folder
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="test_archive_")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from downloader import FORMAT_OPTIONS, DownloadArchive  # noqa: E402
+
+VIDEO_FORMAT = FORMAT_OPTIONS[0][1]
+MP3_FORMAT = dict(FORMAT_OPTIONS)["Audio Only (MP3)"]
+
+
+def entry(video_id, title):
+    return {"ie_key": "Youtube", "id": video_id, "title": title}
+
+
+class ScanExistingTest(unittest.TestCase):
+    def setUp(self):
+        self.out = tempfile.mkdtemp(prefix="test_archive_out_")
+
+    def tearDown(self):
+        shutil.rmtree(self.out)
+
+    def touch(self, name):
+        open(os.path.join(self.out, name), "w").close()
+
+    def scan(self, format_option, entries):
+        archive = DownloadArchive(self.out, format_option)
+        archive.scan_existing(entries)
+        return [e["id"] for e in entries if e in archive]
+
+    def test_matches_by_id(self):
+        self.touch("Another name [aaaaaaaaaaa].mkv")
+        entries = [entry("aaaaaaaaaaa", "Song"), entry("bbbbbbbbbbb", "Song 2")]
+        self.assertEqual(self.scan(VIDEO_FORMAT, entries), ["aaaaaaaaaaa"])
+
+    def test_matches_by_title_in_output_extension(self):
+        self.touch("3. Song.mp4")
+        self.touch("4. Other.webm")
+        entries = [entry("aaaaaaaaaaa", "Song"), entry("bbbbbbbbbbb", "Other")]
+        self.assertEqual(self.scan(VIDEO_FORMAT, entries), ["aaaaaaaaaaa"])
+
+    def test_title_in_another_format_is_not_a_match(self):
+        self.touch("1. Song.m4a")
+        self.assertEqual(self.scan(MP3_FORMAT, [entry("aaaaaaaaaaa", "Song")]), [])
+
+    def test_title_in_audio_output_extension(self):
+        self.touch("1. Song.mp3")
+        self.assertEqual(
+            self.scan(MP3_FORMAT, [entry("aaaaaaaaaaa", "Song")]), ["aaaaaaaaaaa"]
+        )
+
+    def test_scans_once(self):
+        self.scan(VIDEO_FORMAT, [])
+        self.touch("1. Song.mp4")
+        self.assertEqual(self.scan(VIDEO_FORMAT, [entry("aaaaaaaaaaa", "Song")]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+"""HistoryStore paging in both directions, as the History tab scrolls
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="test_history_")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from downloader import HistoryStore  # noqa: E402
+
+
+class HistoryPageTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix="test_history_db_")
+        self.store = HistoryStore(os.path.join(self.dir, "history.db"))
+        for i in range(10):
+            status = "stopped" if i % 2 else "completed"
+            self.store.add({"id": f"job{i}", "status": status, "url": f"u{i}"})
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.dir)
+
+    def ids(self, entries):
+        return [entry["id"] for entry in entries]
+
+    def test_pages_down_then_back_up(self):
+        first = self.store.page(limit=4)
+        self.assertEqual(self.ids(first), ["job9", "job8", "job7", "job6"])
+        second = self.store.page(limit=4, before_seq=first[-1]["_seq"])
+        self.assertEqual(self.ids(second), ["job5", "job4", "job3", "job2"])
+
+        # The page above is still newest first
+        previous = self.store.page(limit=3, after_seq=second[0]["_seq"])
+        self.assertEqual(self.ids(previous), ["job8", "job7", "job6"])
+        self.assertEqual(self.store.page(after_seq=first[0]["_seq"]), [])
+
+    def test_previous_page_is_filtered(self):
+        last = self.store.page(limit=2, before_seq=3, status="stopped")
+        self.assertEqual(self.ids(last), ["job1"])
+        previous = self.store.page(limit=2, after_seq=last[0]["_seq"], status="stopped")
+        self.assertEqual(self.ids(previous), ["job5", "job3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
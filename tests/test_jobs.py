@@ -0,0 +1,191 @@
+"""Whole CSV and playlist jobs of DownloadManager against a local HTTP server
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="test_jobs_")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from downloader import (  # noqa: E402
+    CONVERT_EXISTING,
+    FORMAT_OPTIONS,
+    STATUS_COMPLETE,
+    STATUS_INCOMPLETE,
+    DownloadArchive,
+    DownloadManager,
+    JobQueue,
+)
+from server import VideoServer  # noqa: E402
+
+VIDEO_SIZE = 32 * 1024
+MP3_FORMAT = dict(FORMAT_OPTIONS)["Audio Only (MP3)"]
+
+
+class NoPostProcessing:
+    """Stands in for the post-processing YoutubeDL, which needs ffmpeg"""
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def post_process(self, filename, info):
+        self.calls.append(os.path.basename(filename))
+        return info
+
+
+class JobTest(unittest.TestCase):
+    def setUp(self):
+        self.server = VideoServer(
+            {name: VIDEO_SIZE for name in ("a.mp4", "b.mp4", "a.m4a", "b.m4a")}
+        )
+        self.out = tempfile.mkdtemp(prefix="test_jobs_out_")
+        self.events = []
+        self.processed = []
+        self.manager = DownloadManager(self.events.append, quiet=True)
+        self.manager._postprocessor = lambda steps: NoPostProcessing(self.processed)
+
+    def tearDown(self):
+        self.server.close()
+        shutil.rmtree(self.out)
+
+
+class CsvJobTest(JobTest):
+    def run_job(
+        self, names, format_option=FORMAT_OPTIONS[0][1], titles=None, **options
+    ):
+        videos = [
+            {"title": title, "url": self.server.url(name), "row_number": row}
+            for row, (name, title) in enumerate(zip(names, titles or names), start=1)
+        ]
+        options.setdefault("skip_existing", False)
+        self.manager.download_from_csv(
+            videos, self.out, format_option, max_workers=1, **options
+        )
+        final = self.events[-1]
+        return final, self.manager.history.get(final["download_id"])
+
+    def test_failed_video_is_reported(self):
+        final, entry = self.run_job(["missing.mp4", "a.mp4", "b.mp4"])
+
+        self.assertEqual(final["status"], STATUS_INCOMPLETE.format(1, 3))
+        self.assertEqual(final["failed"], 1)
+        self.assertEqual(entry["status"], "incomplete")
+        self.assertEqual(entry["failed"], 1)
+        # The videos after the failed one are still post-processed
+        self.assertEqual(sorted(self.processed), ["2. a.mp4", "3. b.mp4"])
+
+    def test_all_videos_downloaded(self):
+        final, entry = self.run_job(["a.mp4", "b.mp4"])
+
+        self.assertEqual(final["status"], STATUS_COMPLETE)
+        self.assertEqual(final["failed"], 0)
+        self.assertEqual(entry["status"], "completed")
+
+    def test_converted_audio_is_not_downloaded_again(self):
+        open(os.path.join(self.out, "1. a.mp3"), "w").close()
+        # ffprobe would check the codec and bitrate of the MP3
+        with mock.patch(
+            "downloader.audio_output_matches", lambda path, *_: os.path.exists(path)
+        ):
+            final, entry = self.run_job(["a.m4a", "b.m4a"], MP3_FORMAT)
+
+        self.assertEqual(final["status"], STATUS_COMPLETE)
+        self.assertEqual(entry["conversions"]["1"][0], CONVERT_EXISTING)
+        downloading = {
+            event["playlist_index"]
+            for event in self.events
+            if event.get("status") == "downloading"
+        }
+        self.assertEqual(downloading, {2})
+        self.assertEqual(self.processed, ["2. b.m4a"])
+        self.assertFalse(os.path.exists(os.path.join(self.out, "1. a.m4a")))
+
+    def test_existing_file_is_found_by_the_video_title(self):
+        # Saved earlier under another row number, named by the video's title
+        open(os.path.join(self.out, "7. a.mp4"), "w").close()
+        final, entry = self.run_job(
+            ["a.mp4", "b.mp4"],
+            titles=["My favourite song", "Another one"],
+            skip_existing=True,
+        )
+
+        self.assertEqual(final["status"], STATUS_COMPLETE)
+        self.assertEqual(entry["conversions"]["1"][0], CONVERT_EXISTING)
+        self.assertEqual(self.processed, ["2. b.mp4"])
+
+
+class PlaylistJobTest(JobTest):
+    PLAYLIST_URL = "https://www.youtube.com/playlist?list=PLtest"
+
+    def set_playlist(self, names):
+        self.manager.current_playlist_info = {
+            "id": "PLtest",
+            "title": "Test playlist",
+            "original_url": self.PLAYLIST_URL,
+            "entries": [
+                {
+                    "ie_key": "Generic",
+                    "id": name,
+                    "title": name,
+                    "url": self.server.url(name),
+                }
+                for name in names
+            ],
+        }
+
+    def run_job(self, names):
+        self.set_playlist(names)
+        self.manager.download_playlist(
+            self.PLAYLIST_URL, self.out, FORMAT_OPTIONS[0][1], max_workers=1
+        )
+        return self.events[-1]
+
+    def test_videos_after_a_failure_are_archived(self):
+        names = ["missing.mp4", "a.mp4", "b.mp4"]
+        self.run_job(names)
+
+        archive = DownloadArchive(self.out, FORMAT_OPTIONS[0][1])
+        entries = self.manager.current_playlist_info["entries"]
+        self.assertEqual([e["id"] for e in entries if e in archive], names[1:])
+
+        # Syncing again only retries the video that failed
+        self.processed.clear()
+        final = self.run_job(names)
+        self.assertEqual(final["status"], STATUS_INCOMPLETE.format(1, 1))
+        self.assertEqual(self.processed, [])
+
+    def test_queued_job_finds_its_videos_by_id(self):
+        queue = JobQueue(
+            self.manager, slots=0, db_path=os.path.join(self.out, "queue.db")
+        )
+        self.addCleanup(queue.close)
+        self.set_playlist(["a.mp4", "b.mp4"])
+        queue.add(
+            "playlist",
+            "Test playlist",
+            {
+                "playlist_url": self.PLAYLIST_URL,
+                "output_dir": self.out,
+                "format_option": FORMAT_OPTIONS[0][1],
+                "selected_ids": ["b.mp4"],
+            },
+        )
+
+        # The playlist changes while the job waits for a slot
+        self.set_playlist(["b.mp4", "a.mp4"])
+        queue.set_slots(1)
+        self.assertTrue(queue.join(timeout=30))
+
+        self.assertEqual(self.events[-1]["status"], STATUS_COMPLETE)
+        self.assertEqual(self.processed, ["1. b.mp4"])
+
+
+if __name__ == "__main__":
+    unittest.main()
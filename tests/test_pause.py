@@ -0,0 +1,86 @@
+"""Pausing and resuming a transfer of DownloadManager._download_item
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from threading import Timer
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="test_pause_")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from downloader import DownloadManager, YoutubeDLSession  # noqa: E402
+from server import VideoServer  # noqa: E402
+from test_session import SESSION_OPTIONS  # noqa: E402
+
+VIDEO_SIZE = 256 * 1024
+
+
+class PauseResumeTest(unittest.TestCase):
+    def setUp(self):
+        # About a second per video, so the pause lands mid-transfer
+        self.server = VideoServer(
+            {"1.mp4": VIDEO_SIZE, "2.mp4": VIDEO_SIZE}, chunk_delay=0.03
+        )
+        self.out = tempfile.mkdtemp(prefix="test_pause_out_")
+        self.manager = DownloadManager(None, quiet=True)
+        self.job = self.manager.jobs.register("job")
+        self.job.begin([1, 2], 1)
+        self.session = YoutubeDLSession(SESSION_OPTIONS)
+
+    def tearDown(self):
+        self.session.close()
+        self.manager.jobs.remove("job")
+        self.server.close()
+        shutil.rmtree(self.out)
+
+    def download(self, index, progress_hook):
+        retcode = self.manager._download_item(
+            "job",
+            self.session,
+            self.server.url(f"{index}.mp4"),
+            os.path.join(self.out, f"{index}. %(title)s.%(ext)s"),
+            progress_hook,
+        )
+        return retcode, self.session.handoff.info
+
+    def test_resumed_video_and_the_next_succeed(self):
+        paused = []
+
+        def pause_once(d):
+            if d["status"] == "downloading" and not paused:
+                paused.append(d.get("downloaded_bytes"))
+                self.manager.pause_download("job")
+                Timer(0.3, self.manager.resume_download, ("job",)).start()
+            self.manager.update_progress(d, "job", 1, 2, 1)
+
+        retcode, info = self.download(1, pause_once)
+        self.assertTrue(paused)
+        self.assertEqual(retcode, 0)
+        self.assertEqual(os.path.getsize(info["filepath"]), VIDEO_SIZE)
+
+        retcode, info = self.download(
+            2, lambda d: self.manager.update_progress(d, "job", 2, 2, 1)
+        )
+        self.assertEqual(retcode, 0)
+        self.assertEqual(os.path.getsize(info["filepath"]), VIDEO_SIZE)
+
+    def test_stopped_video_fails(self):
+        def stop(d):
+            self.manager.stop_download("job")
+            self.manager.update_progress(d, "job", 1, 2, 1)
+
+        retcode, info = self.download(1, stop)
+        self.assertEqual(retcode, 1)
+        self.assertIsNone(info)
+        # Cancelled rather than failed, as far as yt-dlp is concerned
+        self.assertEqual(self.session.ydl._download_retcode, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
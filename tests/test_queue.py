@@ -0,0 +1,92 @@
+"""JobQueue slots, with stand-in jobs that run until they are stopped
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="test_queue_")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from downloader import (  # noqa: E402
+    QUEUE_PAUSED,
+    QUEUE_RUNNING,
+    QUEUE_WAITING,
+    DownloadManager,
+    JobQueue,
+)
+
+
+class JobQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = DownloadManager(None, quiet=True)
+        self.manager.download_playlist = self.fake_download
+        self.queue = JobQueue(
+            self.manager, slots=1, db_path=os.path.join(os.environ["HOME"], "q.db")
+        )
+
+    def tearDown(self):
+        for job in self.queue.jobs():
+            self.queue.stop(job["id"])
+        self.assertTrue(self.wait_for(lambda: not self.queue.jobs()))
+        self.queue.close()
+
+    def fake_download(self, max_workers, job_id, **params):
+        control = self.manager.jobs[job_id].control
+        while control.wait_while_paused():
+            time.sleep(0.01)
+
+    def wait_for(self, condition, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def states(self):
+        return [job["state"] for job in self.queue.jobs()]
+
+    def test_resumed_job_waits_for_a_free_slot(self):
+        first = self.queue.add("playlist", "first", {})
+        second = self.queue.add("playlist", "second", {})
+        self.assertEqual(self.states(), [QUEUE_RUNNING, QUEUE_WAITING])
+
+        # Pausing the first job frees its slot for the second
+        self.queue.pause(first)
+        self.assertEqual(self.states(), [QUEUE_PAUSED, QUEUE_RUNNING])
+
+        # With the only slot taken, the first job stays paused in the queue
+        self.queue.resume(first)
+        self.assertEqual(self.states(), [QUEUE_WAITING, QUEUE_RUNNING])
+        self.assertTrue(self.manager.jobs[first].control.paused)
+
+        # And continues once the second one is done
+        self.queue.stop(second)
+        self.assertTrue(self.wait_for(lambda: self.states() == [QUEUE_RUNNING]))
+        self.assertFalse(self.manager.jobs[first].control.paused)
+
+    def test_priority_is_saved_and_applied_to_a_running_job(self):
+        job_id = self.queue.add("playlist", "first", {})
+        self.queue.set_priority(job_id, 3)
+        self.assertEqual(self.queue.jobs()[0]["params"]["priority"], 3)
+        self.assertEqual(self.manager.limiter._jobs[job_id][0], 3)
+
+        # The download's own priority does not undo the queue's
+        self.manager.limiter.add(job_id, 1)
+        self.assertEqual(self.manager.limiter._jobs[job_id][0], 3)
+
+        # And the queue keeps it across restarts
+        reopened = JobQueue(
+            self.manager, db_path=os.path.join(os.environ["HOME"], "q.db")
+        )
+        self.addCleanup(reopened.close)
+        self.assertEqual(reopened.jobs()[0]["params"]["priority"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
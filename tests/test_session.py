@@ -0,0 +1,70 @@
+"""YoutubeDLSession against a local HTTP server, so no network is needed
+
+Run with: python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+os.environ["HOME"] = tempfile.mkdtemp(prefix="test_session_")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from downloader import YoutubeDLSession  # noqa: E402
+from server import VideoServer  # noqa: E402
+
+VIDEO_SIZE = 64 * 1024
+
+# Options as download_playlist builds them, minus the format choice
+SESSION_OPTIONS = {
+    "quiet": True,
+    "no_warnings": True,
+    "noprogress": True,
+    "ignoreerrors": True,
+    "outtmpl": "%(title)s.%(ext)s",
+}
+
+
+def setUpModule():
+    global server
+    server = VideoServer({"video.mp4": VIDEO_SIZE})
+
+
+def tearDownModule():
+    server.close()
+
+
+class YoutubeDLSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.out = tempfile.mkdtemp(prefix="test_session_out_")
+        self.session = YoutubeDLSession(SESSION_OPTIONS)
+
+    def tearDown(self):
+        self.session.close()
+        shutil.rmtree(self.out)
+
+    def download(self, name, row):
+        return self.session.download(
+            server.url(name), os.path.join(self.out, f"{row}. %(title)s.%(ext)s")
+        )
+
+    def test_success_after_failure(self):
+        self.assertEqual(self.download("missing.mp4", 1), 1)
+        self.assertIsNone(self.session.handoff.info)
+
+        self.assertEqual(self.download("video.mp4", 2), 0)
+        info = self.session.handoff.info
+        self.assertIsNotNone(info)
+        self.assertEqual(os.path.getsize(info["filepath"]), VIDEO_SIZE)
+
+    def test_failure_after_success(self):
+        self.assertEqual(self.download("video.mp4", 1), 0)
+        self.assertEqual(self.download("missing.mp4", 2), 1)
+        self.assertIsNone(self.session.handoff.info)
+
+
+if __name__ == "__main__":
+    unittest.main()